@@ -1,14 +1,23 @@
 import os
 
-from __venv__ import find, pivot
+from __venv__ import cache, pivot
 
 project_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
-venv_directory = find.virtualenv_location(project_directory)
+cached = cache.load(project_directory)
+if cached is not None:
+    venv_directory, site_directory = cached
+else:
+    # resolving walks parent directories and possibly all of WORKON_HOME, so it is only done when the cache is stale
+    from __venv__ import find
+
+    venv_directory = find.virtualenv_location(project_directory)
+    site_directory = pivot.site_directory(venv_directory)
+    cache.store(project_directory, find.pipfile_location(project_directory), venv_directory, site_directory)
 
 print("pivoting pwd to " + project_directory)
 os.chdir(project_directory)
 
 print("pivoting virtualenv to " + venv_directory)
-pivot.activate_virtualenv(venv_directory)
+pivot.activate_virtualenv(venv_directory, site_directory)
 
 activated = True
@@ -0,0 +1,77 @@
+import json
+import os
+import sys
+
+CACHE_FILE = ".venv-location.json"
+# everything find.virtualenv_location depends on besides the Pipfile itself. VIRTUAL_ENV is checked separately,
+# activating the virtualenv sets it, so it differs between the first load and a reload in the same process.
+ENVIRONMENT_KEYS = (
+    "PIPENV_ACTIVE", "PIPENV_IGNORE_VIRTUALENVS", "PIPENV_NO_IGNORE_VIRTUALENVS",
+    "PIPENV_CUSTOM_VENV_NAME", "PIPENV_PYTHON", "PIPENV_VENV_IN_PROJECT", "PIPENV_NO_VENV_IN_PROJECT",
+    "PIPENV_PIPFILE", "PIPENV_MAX_DEPTH", "WORKON_HOME", "XDG_DATA_HOME",
+)
+
+
+def _dot_venv(project_directory: str):
+    # a .venv directory is the virtualenv itself, a .venv file names it
+    path = os.path.join(project_directory, ".venv")
+    if os.path.isdir(path):
+        return "directory"
+    try:
+        with open(path) as f:
+            return ["file", f.read().strip()]
+    except OSError:
+        return None
+
+
+def _key(project_directory: str) -> dict:
+    return {
+        "project": project_directory,
+        "python": "{0}.{1}".format(*sys.version_info[:2]),
+        "environment": {key: os.environ.get(key) for key in ENVIRONMENT_KEYS},
+        "dot_venv": _dot_venv(project_directory),
+    }
+
+
+def _cache_path(project_directory: str) -> str:
+    return os.path.join(project_directory, CACHE_FILE)
+
+
+def load(project_directory: str):
+    """Return the cached (venv directory, site directory) or None if the cache is missing or stale."""
+    try:
+        with open(_cache_path(project_directory)) as f:
+            cached = json.load(f)
+        if cached["key"] != _key(project_directory):
+            return None
+        virtual_env = os.environ.get("VIRTUAL_ENV")
+        if virtual_env and virtual_env != cached["venv_directory"]:
+            return None
+        if os.stat(cached["pipfile"]).st_mtime_ns != cached["pipfile_mtime"]:
+            return None
+        if not os.path.isdir(cached["site_directory"]):
+            return None
+        return cached["venv_directory"], cached["site_directory"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def store(project_directory: str, pipfile: str, venv_directory: str, site_directory: str):
+    if os.environ.get("VIRTUAL_ENV"):
+        # taken straight from the environment, which is already fast and mustn't outlive the environment
+        return
+    try:
+        cached = {
+            "key": _key(project_directory),
+            "pipfile": pipfile,
+            "pipfile_mtime": os.stat(pipfile).st_mtime_ns,
+            "venv_directory": venv_directory,
+            "site_directory": site_directory,
+        }
+        path = _cache_path(project_directory)
+        with open(path + ".tmp", "w") as f:
+            json.dump(cached, f)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        # the cache is only an optimization, a read-only install just resolves every time
+        pass
@@ -36,11 +36,22 @@ import os
 import site
 import sys
 import sysconfig
+from typing import Optional
 
 install_scheme = sysconfig._INSTALL_SCHEMES["venv"]
 
 
-def activate_virtualenv(venv_directory: str):
+def site_directory(venv_directory: str) -> str:
+    return sysconfig.get_path("purelib", "venv", {
+        "base": venv_directory,
+        "userbase": venv_directory,
+        "installed_base": venv_directory,
+        "platbase": venv_directory,
+        "installed_platbase": venv_directory,
+    }, expand=True)
+
+
+def activate_virtualenv(venv_directory: str, lib_path: Optional[str] = None):
     # prepend bin to PATH (this file is inside the bin directory)
     os.environ["PATH"] = os.pathsep.join(
         [os.path.join(venv_directory, "bin")] +
@@ -50,13 +61,8 @@ def activate_virtualenv(venv_directory: str):
 
     # add the virtual environments libraries to the host python import mechanism
     prev_length = len(sys.path)
-    lib_path = sysconfig.get_path("purelib", "venv", {
-        "base": venv_directory,
-        "userbase": venv_directory,
-        "installed_base": venv_directory,
-        "platbase": venv_directory,
-        "installed_platbase": venv_directory,
-    }, expand=True)
+    if lib_path is None:
+        lib_path = site_directory(venv_directory)
     site.addsitedir(lib_path)
     sys.path[:] = sys.path[prev_length:] + sys.path[0:prev_length]
 
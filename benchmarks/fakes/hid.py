@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+# In-process stand-in for the hid module. Attached devices answer reads from a queue of input reports and
+# record every report written to them. Feature reports are answered with zeroes.
+
+from collections import deque
+from typing import Optional
+
+
+class HIDException(Exception):
+    pass
+
+
+class FakeHidDevice:
+    info: dict
+    reports: deque[bytes]
+    written: list[bytes]
+    features: list[bytes]
+    fail: bool
+
+    def __init__(self, vendor_id: int, product_id: int, serial_number: str, path: bytes):
+        self.info = {
+            "path": path,
+            "vendor_id": vendor_id,
+            "product_id": product_id,
+            "serial_number": serial_number,
+            "release_number": 0x100,
+            "manufacturer_string": "Blackmagic Design",
+            "product_string": "Fake {0:04x}".format(product_id),
+            "usage_page": 0,
+            "usage": 0,
+            "interface_number": 0,
+        }
+        self.reports = deque()
+        self.written = []
+        self.features = []
+        self.fail = False
+
+    def queue_report(self, report: bytes):
+        self.reports.append(bytes(report))
+
+
+attached: list[FakeHidDevice] = []
+enumerations = 0
+
+
+def attach(vendor_id: int, product_id: int, serial_number: str) -> FakeHidDevice:
+    device = FakeHidDevice(vendor_id, product_id, serial_number,
+                           "/dev/hidraw{0}".format(len(attached)).encode())
+    attached.append(device)
+    return device
+
+
+def detach(device: FakeHidDevice):
+    attached.remove(device)
+
+
+def reset():
+    global enumerations
+    attached.clear()
+    enumerations = 0
+
+
+def enumerate(vid: int = 0, pid: int = 0) -> list[dict]:
+    global enumerations
+    enumerations += 1
+    return [dict(device.info) for device in attached
+            if (vid == 0 or device.info["vendor_id"] == vid) and (pid == 0 or device.info["product_id"] == pid)]
+
+
+class Device:
+    _device: Optional[FakeHidDevice]
+
+    def __init__(self, vid: Optional[int] = None, pid: Optional[int] = None, serial: Optional[str] = None,
+                 path: Optional[bytes] = None):
+        self._device = None
+        for device in attached:
+            info = device.info
+            if path is not None and info["path"] == path or \
+                    path is None and info["vendor_id"] == vid and info["product_id"] == pid and \
+                    (serial is None or info["serial_number"] == serial):
+                self._device = device
+                break
+        if self._device is None:
+            raise HIDException("unable to open device")
+
+    def _check(self) -> FakeHidDevice:
+        if self._device is None or self._device not in attached or self._device.fail:
+            raise HIDException("device disconnected")
+        return self._device
+
+    def read(self, size: int, timeout: Optional[int] = None) -> bytes:
+        device = self._check()
+        if device.reports:
+            return device.reports.popleft()[:size]
+        return b""
+
+    def write(self, data: bytes) -> int:
+        self._check().written.append(bytes(data))
+        return len(data)
+
+    def get_feature_report(self, report_id: int, size: int) -> bytes:
+        self._check()
+        return bytes([report_id]) + bytes(size - 1)
+
+    def send_feature_report(self, data: bytes) -> int:
+        self._check().features.append(bytes(data))
+        return len(data)
+
+    def get_input_report(self, report_id: int, size: int) -> bytes:
+        self._check()
+        return bytes([report_id]) + bytes(size - 1)
+
+    def close(self):
+        self._device = None
+
+    @property
+    def manufacturer(self) -> str:
+        return self._check().info["manufacturer_string"]
+
+    @property
+    def product(self) -> str:
+        return self._check().info["product_string"]
+
+    @property
+    def serial(self) -> str:
+        return self._check().info["serial_number"]
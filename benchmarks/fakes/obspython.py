@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+# In-process stand-in for the obspython module, just enough of the frontend API for the benchmarks.
+# Frontend setters emit the same events OBS would, so the plugin sees realistic event traffic.
+
+from typing import Any, Callable, Optional
+
+Source = Any
+Data = Any
+Properties = Any
+Property = Any
+FrontendEvent = int
+
+LOG_ERROR = 100
+LOG_WARNING = 200
+LOG_INFO = 300
+LOG_DEBUG = 400
+
+OBS_COMBO_TYPE_LIST = 2
+OBS_COMBO_FORMAT_INT = 1
+
+OBS_TEXT_DEFAULT = 0
+OBS_TEXT_PASSWORD = 1
+OBS_TEXT_MULTILINE = 2
+OBS_TEXT_INFO = 3
+OBS_PATH_FILE = 0
+OBS_PATH_FILE_SAVE = 1
+OBS_PATH_DIRECTORY = 2
+
+OBS_FRONTEND_EVENT_STREAMING_STARTING = 0
+OBS_FRONTEND_EVENT_STREAMING_STARTED = 1
+OBS_FRONTEND_EVENT_STREAMING_STOPPING = 2
+OBS_FRONTEND_EVENT_STREAMING_STOPPED = 3
+OBS_FRONTEND_EVENT_RECORDING_STARTING = 4
+OBS_FRONTEND_EVENT_RECORDING_STARTED = 5
+OBS_FRONTEND_EVENT_RECORDING_STOPPING = 6
+OBS_FRONTEND_EVENT_RECORDING_STOPPED = 7
+OBS_FRONTEND_EVENT_SCENE_CHANGED = 8
+OBS_FRONTEND_EVENT_SCENE_LIST_CHANGED = 9
+OBS_FRONTEND_EVENT_TRANSITION_CHANGED = 10
+OBS_FRONTEND_EVENT_TRANSITION_STOPPED = 11
+OBS_FRONTEND_EVENT_TRANSITION_LIST_CHANGED = 12
+OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGED = 13
+OBS_FRONTEND_EVENT_SCENE_COLLECTION_LIST_CHANGED = 14
+OBS_FRONTEND_EVENT_PROFILE_CHANGED = 15
+OBS_FRONTEND_EVENT_PROFILE_LIST_CHANGED = 16
+OBS_FRONTEND_EVENT_EXIT = 17
+OBS_FRONTEND_EVENT_REPLAY_BUFFER_STARTING = 18
+OBS_FRONTEND_EVENT_REPLAY_BUFFER_STARTED = 19
+OBS_FRONTEND_EVENT_REPLAY_BUFFER_STOPPING = 20
+OBS_FRONTEND_EVENT_REPLAY_BUFFER_STOPPED = 21
+OBS_FRONTEND_EVENT_STUDIO_MODE_ENABLED = 22
+OBS_FRONTEND_EVENT_STUDIO_MODE_DISABLED = 23
+OBS_FRONTEND_EVENT_PREVIEW_SCENE_CHANGED = 24
+OBS_FRONTEND_EVENT_SCENE_COLLECTION_CLEANUP = 25
+OBS_FRONTEND_EVENT_FINISHED_LOADING = 26
+OBS_FRONTEND_EVENT_RECORDING_PAUSED = 27
+OBS_FRONTEND_EVENT_RECORDING_UNPAUSED = 28
+OBS_FRONTEND_EVENT_TRANSITION_DURATION_CHANGED = 29
+OBS_FRONTEND_EVENT_REPLAY_BUFFER_SAVED = 30
+OBS_FRONTEND_EVENT_VIRTUALCAM_STARTED = 31
+OBS_FRONTEND_EVENT_VIRTUALCAM_STOPPED = 32
+OBS_FRONTEND_EVENT_TBAR_VALUE_CHANGED = 33
+OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGING = 34
+OBS_FRONTEND_EVENT_PROFILE_CHANGING = 35
+OBS_FRONTEND_EVENT_SCRIPTING_SHUTDOWN = 36
+OBS_FRONTEND_EVENT_PROFILE_RENAMED = 37
+OBS_FRONTEND_EVENT_SCENE_COLLECTION_RENAMED = 38
+OBS_FRONTEND_EVENT_THEME_CHANGED = 39
+OBS_FRONTEND_EVENT_SCREENSHOT_TAKEN = 40
+
+
+class FakeSource:
+    id: str
+    name: str
+    refs: int
+
+    def __init__(self, id: str, name: str):
+        self.id = id
+        self.name = name
+        self.refs = 1
+
+    def __repr__(self):
+        return "FakeSource({0!r}, {1!r})".format(self.id, self.name)
+
+
+class FakeFrontend:
+    scenes: list[FakeSource]
+    transitions: list[FakeSource]
+    program: Optional[FakeSource]
+    preview: Optional[FakeSource]
+    transition: Optional[FakeSource]
+    duration: int
+    frame_interval_ns: int
+    callbacks: list[Callable[[FrontendEvent], None]]
+    timers: list[tuple[Callable[[], None], int]]
+    calls: int
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, scene_count: int = 9):
+        self.scenes = [FakeSource("scene", "Scene {0}".format(i + 1)) for i in range(scene_count)]
+        self.transitions = [FakeSource("cut_transition", "Cut"), FakeSource("fade_transition", "Fade"),
+                            FakeSource("swipe_transition", "Swipe")]
+        self.program = self.scenes[0] if self.scenes else None
+        self.preview = self.scenes[1] if len(self.scenes) > 1 else self.program
+        self.transition = self.transitions[0]
+        self.duration = 300
+        self.frame_interval_ns = 16_666_667
+        self.callbacks = []
+        self.timers = []
+        self.calls = 0
+
+    def emit(self, event: FrontendEvent):
+        for callback in list(self.callbacks):
+            callback(event)
+
+    def tick(self):
+        for callback, _ in list(self.timers):
+            callback()
+
+
+frontend = FakeFrontend()
+
+
+def script_log(level: int, message: str):
+    pass
+
+
+def timer_add(callback: Callable[[], None], milliseconds: int):
+    frontend.timers.append((callback, milliseconds))
+
+
+def timer_remove(callback: Callable[[], None]):
+    frontend.timers = [(timer, interval) for timer, interval in frontend.timers if timer != callback]
+
+
+def obs_frontend_add_event_callback(callback: Callable[[FrontendEvent], None]):
+    frontend.callbacks.append(callback)
+
+
+def obs_frontend_remove_event_callback(callback: Callable[[FrontendEvent], None]):
+    if callback in frontend.callbacks:
+        frontend.callbacks.remove(callback)
+
+
+def obs_get_frame_interval_ns() -> int:
+    return frontend.frame_interval_ns
+
+
+def _addref(source: Optional[FakeSource]) -> Optional[FakeSource]:
+    if source is not None:
+        source.refs += 1
+    return source
+
+
+def obs_source_release(source: Optional[FakeSource]):
+    if source is not None:
+        source.refs -= 1
+
+
+def source_list_release(sources: list[FakeSource]):
+    for source in sources:
+        source.refs -= 1
+
+
+def obs_source_get_name(source: FakeSource) -> str:
+    return source.name
+
+
+def obs_source_get_id(source: FakeSource) -> str:
+    return source.id
+
+
+def obs_source_get_type(source: FakeSource) -> int:
+    return 0
+
+
+def obs_frontend_get_scenes() -> list[FakeSource]:
+    frontend.calls += 1
+    return [_addref(scene) for scene in frontend.scenes]
+
+
+def obs_frontend_get_transitions() -> list[FakeSource]:
+    frontend.calls += 1
+    return [_addref(transition) for transition in frontend.transitions]
+
+
+def obs_frontend_get_current_scene() -> Optional[FakeSource]:
+    frontend.calls += 1
+    return _addref(frontend.program)
+
+
+def obs_frontend_get_current_preview_scene() -> Optional[FakeSource]:
+    frontend.calls += 1
+    return _addref(frontend.preview)
+
+
+def obs_frontend_set_current_preview_scene(scene: FakeSource):
+    frontend.calls += 1
+    if frontend.preview is not scene:
+        frontend.preview = scene
+        frontend.emit(OBS_FRONTEND_EVENT_PREVIEW_SCENE_CHANGED)
+
+
+def obs_frontend_preview_program_trigger_transition():
+    frontend.calls += 1
+    frontend.program, frontend.preview = frontend.preview, frontend.program
+    frontend.emit(OBS_FRONTEND_EVENT_SCENE_CHANGED)
+    frontend.emit(OBS_FRONTEND_EVENT_PREVIEW_SCENE_CHANGED)
+
+
+def obs_frontend_get_current_transition() -> Optional[FakeSource]:
+    frontend.calls += 1
+    return _addref(frontend.transition)
+
+
+def obs_frontend_set_current_transition(transition: FakeSource):
+    frontend.calls += 1
+    if frontend.transition is not transition:
+        frontend.transition = transition
+        frontend.emit(OBS_FRONTEND_EVENT_TRANSITION_CHANGED)
+
+
+def obs_frontend_get_transition_duration() -> int:
+    frontend.calls += 1
+    return frontend.duration
+
+
+def obs_frontend_set_transition_duration(duration: int):
+    frontend.calls += 1
+    if frontend.duration != duration:
+        frontend.duration = duration
+        frontend.emit(OBS_FRONTEND_EVENT_TRANSITION_DURATION_CHANGED)
+
+
+def obs_data_create() -> dict:
+    return {}
+
+
+def _data_get(data: dict, name: str, default):
+    if name in data:
+        return data[name]
+    return data.get(("default", name), default)
+
+
+def obs_data_get_int(data: dict, name: str) -> int:
+    return _data_get(data, name, 0)
+
+
+def obs_data_get_double(data: dict, name: str) -> float:
+    return _data_get(data, name, 0.0)
+
+
+def obs_data_get_bool(data: dict, name: str) -> bool:
+    return _data_get(data, name, False)
+
+
+def obs_data_get_string(data: dict, name: str) -> str:
+    return _data_get(data, name, "")
+
+
+def obs_data_has_user_value(data: dict, name: str) -> bool:
+    return name in data
+
+
+def obs_data_has_default_value(data: dict, name: str) -> bool:
+    return ("default", name) in data
+
+
+def obs_data_set_int(data: dict, name: str, value: int):
+    data[name] = value
+
+
+def obs_data_set_double(data: dict, name: str, value: float):
+    data[name] = value
+
+
+def obs_data_set_bool(data: dict, name: str, value: bool):
+    data[name] = value
+
+
+def obs_data_set_string(data: dict, name: str, value: str):
+    data[name] = value
+
+
+def obs_data_set_default_int(data: dict, name: str, value: int):
+    data[("default", name)] = value
+
+
+def obs_data_set_default_double(data: dict, name: str, value: float):
+    data[("default", name)] = value
+
+
+def obs_data_set_default_bool(data: dict, name: str, value: bool):
+    data[("default", name)] = value
+
+
+def obs_data_set_default_string(data: dict, name: str, value: str):
+    data[("default", name)] = value
+
+
+def obs_data_set_autoselect_int(data: dict, name: str, value: int):
+    pass
+
+
+def obs_properties_create() -> dict:
+    return {}
+
+
+def _add_property(properties: dict, name: str, description: str) -> dict:
+    prop = {"description": description, "items": []}
+    properties[name] = prop
+    return prop
+
+
+def obs_properties_add_list(properties: dict, name: str, description: str, type: int, format: int) -> dict:
+    return _add_property(properties, name, description)
+
+
+def obs_properties_add_bool(properties: dict, name: str, description: str) -> dict:
+    return _add_property(properties, name, description)
+
+
+def obs_properties_add_int(properties: dict, name: str, description: str, min: int, max: int, step: int) -> dict:
+    return _add_property(properties, name, description)
+
+
+def obs_properties_add_float(properties: dict, name: str, description: str,
+                             min: float, max: float, step: float) -> dict:
+    return _add_property(properties, name, description)
+
+
+def obs_properties_add_text(properties: dict, name: str, description: str, type: int) -> dict:
+    return _add_property(properties, name, description)
+
+
+def obs_properties_add_path(properties: dict, name: str, description: str, type: int, filter: Optional[str],
+                            default_path: Optional[str]) -> dict:
+    return _add_property(properties, name, description)
+
+
+def obs_properties_add_button(properties: dict, name: str, description: str, callback: Callable) -> dict:
+    return _add_property(properties, name, description)
+
+
+def obs_property_list_add_int(prop: dict, name: str, value: int):
+    prop["items"].append((name, value))
+
+
+def obs_property_list_add_string(prop: dict, name: str, value: str):
+    prop["items"].append((name, value))
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+from typing import Callable
+
+# log needs obspython, the fake one only has to shadow it
+FAKES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fakes")
+PROJECT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (PROJECT_DIRECTORY, FAKES_DIRECTORY):
+    if path in sys.path:
+        sys.path.remove(path)
+    sys.path.insert(0, path)
+
+from hotplug import HotplugWatcher
+
+
+# Each step changes the fake /dev and states whether the watcher should report the device list as changed
+def steps(directory: str) -> list[tuple[str, Callable[[], None], bool]]:
+    def path(name: str) -> str:
+        return os.path.join(directory, name)
+
+    def create(name: str) -> Callable[[], None]:
+        return lambda: open(path(name), "w").close()
+
+    return [
+        ("first check", lambda: None, True),
+        ("nothing happened", lambda: None, False),
+        ("hidraw0 created", create("hidraw0"), True),
+        ("unrelated node created", create("ttyUSB0"), False),
+        ("hidraw0 permissions applied", lambda: os.chmod(path("hidraw0"), 0o660), True),
+        ("unrelated node removed", lambda: os.remove(path("ttyUSB0")), False),
+        ("hidraw0 renamed", lambda: os.rename(path("hidraw0"), path("hidraw1")), True),
+        ("hidraw1 removed", lambda: os.remove(path("hidraw1")), True),
+        ("nothing happened", lambda: None, False),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exercise the hotplug watcher against a temporary stand-in for /dev")
+    parser.add_argument("-n", "--number", type=int, default=100000, help="idle checks to time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="fake-dev-") as directory:
+        watcher = HotplugWatcher(directory)
+        if not watcher.available():
+            print("inotify is unavailable, the watcher reports a change on every check")
+            return
+        failures = 0
+        for description, change, expected in steps(directory):
+            change()
+            changed = watcher.changed()
+            failures += changed != expected
+            print("{0:<30} changed={1!s:<6} {2}".format(description, changed, "ok" if changed == expected else "FAIL"))
+        watcher.invalidate()
+        changed = watcher.changed()
+        failures += not changed
+        print("{0:<30} changed={1!s:<6} {2}".format("invalidated", changed, "ok" if changed else "FAIL"))
+        seconds = timeit.timeit(watcher.changed, number=args.number)
+        print("idle check: {0:.0f} ns".format(seconds / args.number * 1e9))
+        watcher.close()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
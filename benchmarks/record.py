@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+# this uses the real hid module, the recording has to come from real hardware
+import hid
+from bmd_hid_device.devices import BmdDevices, VID_BMD
+from bmd_hid_device.hiddevice import BmdHidDevice
+from bmd_hid_device.protocol.types import BmdHidKey, BmdHidJogMode
+
+from benchmarks.recording import ReportWriter, RecordedDevice
+
+_writer: ReportWriter
+
+
+class RecordingHidDevice(hid.Device):
+    _recorded: RecordedDevice
+
+    def __init__(self, vid=None, pid=None, serial=None, path=None):
+        super().__init__(vid, pid, serial, path)
+        self._recorded = _writer.find_device(path, serial or self.serial)
+
+    def read(self, size: int, timeout=None) -> bytes:
+        data = super().read(size, timeout)
+        if data:
+            _writer.write_report(self._recorded, data)
+        return data
+
+
+# Lets BmdHidDevice handle the device as usual, reports are captured as they are read
+class RecorderDevice(BmdHidDevice):
+    def on_key_down(self, key: BmdHidKey):
+        print("key down: {0}".format(key.name))
+
+    def on_key_up(self, key: BmdHidKey):
+        pass
+
+    def on_jog_event(self, mode: BmdHidJogMode, value: int):
+        pass
+
+    def on_battery(self, charging: bool, level: int):
+        pass
+
+
+def main():
+    global _writer
+    parser = argparse.ArgumentParser(description="Record raw input reports of all connected BMD devices")
+    parser.add_argument("output", help="file to write the recording to")
+    parser.add_argument("-d", "--duration", type=float, default=None, help="stop after this many seconds")
+    args = parser.parse_args()
+
+    with open(args.output, "wb") as file:
+        _writer = ReportWriter(file)
+        infos = [info for info in hid.enumerate(vid=VID_BMD) if (info["vendor_id"], info["product_id"]) in BmdDevices]
+        if not infos:
+            parser.error("could not find any BMD device")
+        for info in infos:
+            _writer.add_device(info["path"], info["vendor_id"], info["product_id"], info["serial_number"])
+
+        original_device = hid.Device
+        hid.Device = RecordingHidDevice
+        try:
+            devices = [RecorderDevice(info) for info in infos]
+        finally:
+            hid.Device = original_device
+
+        print("recording {0} device(s), press Ctrl+C to stop".format(len(devices)))
+        deadline = time.monotonic() + args.duration if args.duration is not None else None
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                for device in devices:
+                    device.poll_available()
+                time.sleep(0.001)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for device in devices:
+                device.close()
+        print("recorded {0} reports".format(_writer.reports))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import struct
+import time
+from typing import BinaryIO, Iterator, NamedTuple, Optional, Union
+
+# File layout: MAGIC followed by records. Every record starts with its type byte.
+# A device record declares vendor id, product id and serial of a device index, report records reference that
+# index and carry the report's time in nanoseconds since the start of the recording.
+MAGIC = b"BMDREC\x01\n"
+RECORD_DEVICE = 0
+RECORD_REPORT = 1
+
+_device_record = struct.Struct("<BBHHB")
+_report_record = struct.Struct("<BBQH")
+
+
+class RecordedDevice(NamedTuple):
+    index: int
+    vendor_id: int
+    product_id: int
+    serial_number: str
+
+
+class RecordedReport(NamedTuple):
+    index: int
+    timestamp_ns: int
+    data: bytes
+
+
+class ReportWriter:
+    _file: BinaryIO
+    _devices: dict[bytes, RecordedDevice]
+    _start_ns: int
+    reports: int
+
+    def __init__(self, file: BinaryIO):
+        self._file = file
+        self._devices = {}
+        self._start_ns = time.monotonic_ns()
+        self.reports = 0
+        self._file.write(MAGIC)
+
+    def add_device(self, path: bytes, vendor_id: int, product_id: int, serial_number: str) -> RecordedDevice:
+        if path in self._devices:
+            return self._devices[path]
+        device = RecordedDevice(len(self._devices), vendor_id, product_id, serial_number)
+        serial = serial_number.encode()
+        self._file.write(_device_record.pack(RECORD_DEVICE, device.index, vendor_id, product_id, len(serial)))
+        self._file.write(serial)
+        self._devices[path] = device
+        return device
+
+    def find_device(self, path: Optional[bytes], serial_number: Optional[str]) -> RecordedDevice:
+        if path in self._devices:
+            return self._devices[path]
+        for device in self._devices.values():
+            if device.serial_number == serial_number:
+                return device
+        raise KeyError("device {0} was not added to the recording".format(path or serial_number))
+
+    def write_report(self, device: RecordedDevice, data: bytes):
+        self._file.write(_report_record.pack(RECORD_REPORT, device.index, time.monotonic_ns() - self._start_ns,
+                                             len(data)))
+        self._file.write(data)
+        self.reports += 1
+
+
+def read_recording(file: BinaryIO) -> Iterator[Union[RecordedDevice, RecordedReport]]:
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a report recording")
+    while True:
+        record_type = file.read(1)
+        if not record_type:
+            return
+        if record_type[0] == RECORD_DEVICE:
+            header = record_type + file.read(_device_record.size - 1)
+            _, index, vendor_id, product_id, length = _device_record.unpack(header)
+            yield RecordedDevice(index, vendor_id, product_id, file.read(length).decode())
+        elif record_type[0] == RECORD_REPORT:
+            header = record_type + file.read(_report_record.size - 1)
+            _, index, timestamp_ns, length = _report_record.unpack(header)
+            yield RecordedReport(index, timestamp_ns, file.read(length))
+        else:
+            raise ValueError("unknown record type {0}".format(record_type[0]))
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+# the rig has to be imported first, it puts the fake obspython and hid modules in place
+from benchmarks.rig import Rig
+
+import hid
+
+from benchmarks.recording import RecordedDevice, RecordedReport, read_recording
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a report recording through the plugin's input path")
+    parser.add_argument("recording", help="file written by benchmarks.record")
+    parser.add_argument("--realtime", action="store_true", help="keep the recorded timing instead of replaying "
+                                                                  "as fast as possible")
+    parser.add_argument("--scenes", type=int, default=9, help="number of scenes in the fake collection")
+    args = parser.parse_args()
+
+    with open(args.recording, "rb") as file:
+        records = list(read_recording(file))
+    recorded_devices = [record for record in records if isinstance(record, RecordedDevice)]
+    reports = [record for record in records if isinstance(record, RecordedReport)]
+
+    rig = Rig(usb_devices=[(device.vendor_id, device.product_id, device.serial_number)
+                           for device in recorded_devices], scenes=args.scenes)
+    fakes: dict[int, hid.FakeHidDevice] = {device.index: fake for device, fake in zip(recorded_devices, rig.fakes)}
+    manager = rig.device_manager
+    latencies = []
+    try:
+        start = time.perf_counter_ns()
+        for report in reports:
+            if args.realtime:
+                delay = start + report.timestamp_ns - time.perf_counter_ns()
+                if delay > 0:
+                    time.sleep(delay / 1e9)
+            fakes[report.index].queue_report(report.data)
+            before = time.perf_counter_ns()
+            manager.poll_input()
+            latencies.append(time.perf_counter_ns() - before)
+        elapsed = time.perf_counter_ns() - start
+    finally:
+        rig.close()
+
+    if not latencies:
+        print("recording contains no reports")
+        return
+    latencies.sort()
+    print("replayed {0} reports from {1} device(s) in {2:.3f} s".format(
+        len(reports), len(recorded_devices), elapsed / 1e9))
+    print("throughput: {0:.0f} reports/s".format(len(reports) / (elapsed / 1e9)))
+    print("per report: p50 {0:.1f} us, p99 {1:.1f} us, max {2:.1f} us".format(
+        latencies[len(latencies) // 2] / 1e3,
+        latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)] / 1e3,
+        latencies[-1] / 1e3))
+    print("OBS frontend calls: {0}".format(rig.obs_calls()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+import sys
+from typing import Optional
+
+# The fakes have to shadow the real modules before anything from the plugin is imported
+FAKES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fakes")
+PROJECT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (PROJECT_DIRECTORY, FAKES_DIRECTORY):
+    if path in sys.path:
+        sys.path.remove(path)
+    sys.path.insert(0, path)
+
+import hid
+import obspython as obs
+from bmd_hid_device.devices import BmdDevices
+
+from bmd_device import ObsBmdDevice
+from devices import DeviceManager
+from events.frontend_event import on_frontend_event_global, add_frontend_event_listener, \
+    remove_frontend_event_listener
+from frontend.state import FrontendState, EVENTS as FRONTEND_STATE_EVENTS
+from frontend.transitions import CATALOGUE_EVENTS
+from settings.input import InputSettings
+from settings.transitions import TransitionSettings
+
+
+# Wires the plugin together the same way script_load does, against the fake obspython and hid modules
+class Rig:
+    fakes: list[hid.FakeHidDevice]
+    settings: obs.Data
+    transition_settings: TransitionSettings
+    input_settings: InputSettings
+    frontend_state: FrontendState
+    device_manager: DeviceManager
+
+    def __init__(self, devices: int = 1, scenes: int = 9,
+                 usb_devices: Optional[list[tuple[int, int, str]]] = None):
+        obs.frontend.reset(scenes)
+        hid.reset()
+        if usb_devices is None:
+            usb_ids = list(BmdDevices)
+            usb_devices = [usb_ids[index % len(usb_ids)] + ("BENCH{0:04d}".format(index),)
+                           for index in range(devices)]
+        self.fakes = [hid.attach(vendor_id, product_id, serial_number)
+                      for vendor_id, product_id, serial_number in usb_devices]
+        devices = len(self.fakes)
+
+        self.settings = obs.obs_data_create()
+        self.transition_settings = TransitionSettings()
+        self.input_settings = InputSettings()
+        self.frontend_state = FrontendState()
+        self.device_manager = DeviceManager(self.transition_settings, self.input_settings, self.frontend_state)
+        self.transition_settings.defaults(self.settings)
+        self.input_settings.defaults(self.settings)
+
+        add_frontend_event_listener(self.frontend_state.on_frontend_event, FRONTEND_STATE_EVENTS)
+        add_frontend_event_listener(self.transition_settings.on_frontend_event, CATALOGUE_EVENTS)
+        self.frontend_state.refresh()
+        self.transition_settings.update(self.settings)
+        self.input_settings.update(self.settings)
+        self.device_manager.settings_changed()
+        self.device_manager.update_devices()
+        obs.obs_frontend_add_event_callback(on_frontend_event_global)
+        if len(self.devices()) != devices:
+            raise RuntimeError("could only open {0} of {1} fake devices".format(len(self.devices()), devices))
+
+    def devices(self) -> list[ObsBmdDevice]:
+        return list(self.device_manager._devices.values())
+
+    def obs_calls(self) -> int:
+        return obs.frontend.calls
+
+    def close(self):
+        obs.obs_frontend_remove_event_callback(on_frontend_event_global)
+        self.device_manager.close()
+        remove_frontend_event_listener(self.frontend_state.on_frontend_event)
+        remove_frontend_event_listener(self.transition_settings.on_frontend_event)
+        self.frontend_state.release()
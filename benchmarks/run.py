@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable, NamedTuple
+
+from benchmarks.scenarios import SCENARIOS, Scenario
+
+
+class Result(NamedTuple):
+    name: str
+    ns_per_op: float
+    blocks_per_op: float
+    bytes_per_op: float
+    peak_bytes: int
+
+
+def _time(operation: Callable[[int], None], iterations: int, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter_ns()
+        for i in range(iterations):
+            operation(i)
+        elapsed = time.perf_counter_ns() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best / iterations
+
+
+def _allocations(operation: Callable[[int], None], iterations: int) -> tuple[float, float, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        for i in range(iterations):
+            operation(i)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "lineno")
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    size = sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+    return blocks / iterations, size / iterations, peak
+
+
+def run(scenario: Scenario, iterations: int, repeat: int) -> Result:
+    rig, operation = scenario.setup()
+    try:
+        # warm up caches the same way a running OBS would have
+        for i in range(min(iterations, 100)):
+            operation(i)
+        ns_per_op = _time(operation, iterations, repeat)
+        blocks_per_op, bytes_per_op, peak_bytes = _allocations(operation, min(iterations, 1000))
+    finally:
+        rig.close()
+    return Result(scenario.name, ns_per_op, blocks_per_op, bytes_per_op, peak_bytes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the plugin's hot paths against fake OBS and HID modules")
+    parser.add_argument("scenarios", nargs="*", help="scenarios to run, all by default")
+    parser.add_argument("-n", "--iterations", type=int, default=10000)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("-l", "--list", action="store_true", help="list scenarios and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for scenario in SCENARIOS:
+            print("{0:<24} {1}".format(scenario.name, scenario.description))
+        return
+
+    selected = [scenario for scenario in SCENARIOS if not args.scenarios or scenario.name in args.scenarios]
+    unknown = set(args.scenarios) - set(scenario.name for scenario in SCENARIOS)
+    if unknown:
+        parser.error("unknown scenarios: {0}".format(", ".join(sorted(unknown))))
+
+    print("{0:<24} {1:>12} {2:>12} {3:>12} {4:>12}".format(
+        "scenario", "ns/op", "blocks/op", "bytes/op", "peak KiB"))
+    for scenario in selected:
+        result = run(scenario, args.iterations, args.repeat)
+        print("{0:<24} {1:>12.0f} {2:>12.2f} {3:>12.1f} {4:>12.1f}".format(
+            result.name, result.ns_per_op, result.blocks_per_op, result.bytes_per_op, result.peak_bytes / 1024))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from typing import Callable, NamedTuple
+
+# the rig has to be imported first, it puts the fake obspython and hid modules in place
+from benchmarks.rig import Rig
+
+import obspython as obs
+from bmd_hid_device.protocol.types import BmdHidKey, BmdHidJogMode
+
+from events.frontend_event import on_frontend_event_global
+
+
+CAM_KEYS = [BmdHidKey.CAM1, BmdHidKey.CAM2, BmdHidKey.CAM3,
+            BmdHidKey.CAM4, BmdHidKey.CAM5, BmdHidKey.CAM6,
+            BmdHidKey.CAM7, BmdHidKey.CAM8, BmdHidKey.CAM9]
+
+
+class Scenario(NamedTuple):
+    name: str
+    description: str
+    setup: Callable[[], tuple[Rig, Callable[[int], None]]]
+
+
+def idle_poll():
+    rig = Rig(devices=1)
+    manager = rig.device_manager
+
+    def operation(i: int):
+        manager.poll_input()
+
+    return rig, operation
+
+
+def idle_poll_8_devices():
+    rig = Rig(devices=8)
+    manager = rig.device_manager
+
+    def operation(i: int):
+        manager.poll_input()
+
+    return rig, operation
+
+
+def cam_cut_storm():
+    rig = Rig(devices=1)
+    device = rig.devices()[0]
+
+    def operation(i: int):
+        device.on_key_down(CAM_KEYS[i % len(CAM_KEYS)])
+        device.on_key_up(CAM_KEYS[i % len(CAM_KEYS)])
+        device.flush()
+        rig.frontend_state.commands.flush()
+
+    return rig, operation
+
+
+def cut_mode_keys():
+    rig = Rig(devices=1)
+    device = rig.devices()[0]
+    keys = [BmdHidKey.CUT, BmdHidKey.DIS, BmdHidKey.SMTH_CUT]
+
+    def operation(i: int):
+        device.on_key_down(keys[i % len(keys)])
+        device.flush()
+        rig.frontend_state.commands.flush()
+
+    return rig, operation
+
+
+def jog_spin():
+    rig = Rig(devices=1)
+    device = rig.devices()[0]
+    device.handle_key_down(BmdHidKey.TRANS_DUR)
+    held_keys = frozenset({BmdHidKey.TRANS_DUR})
+
+    def operation(i: int):
+        device.handle_jog_event(BmdHidJogMode.RELATIVE_DEADZONE, 37 if i % 200 < 100 else -37, held_keys)
+        device.flush()
+        rig.frontend_state.commands.flush()
+
+    return rig, operation
+
+
+def scenes_1000_cam_cut():
+    rig = Rig(devices=1, scenes=1000)
+    device = rig.devices()[0]
+
+    def operation(i: int):
+        device.switch_bank_scene(i % len(CAM_KEYS))
+        rig.frontend_state.commands.flush()
+        device.get_current_cam()
+
+    return rig, operation
+
+
+def scenes_1000_list_changed():
+    rig = Rig(devices=1, scenes=1000)
+
+    def operation(i: int):
+        on_frontend_event_global(obs.OBS_FRONTEND_EVENT_SCENE_LIST_CHANGED)
+
+    return rig, operation
+
+
+def scene_changed_8_devices():
+    rig = Rig(devices=8)
+    scenes = obs.frontend.scenes
+
+    def operation(i: int):
+        obs.frontend.program = scenes[i % len(scenes)]
+        on_frontend_event_global(obs.OBS_FRONTEND_EVENT_SCENE_CHANGED)
+
+    return rig, operation
+
+
+def unrelated_events_8_devices():
+    rig = Rig(devices=8)
+    events = [obs.OBS_FRONTEND_EVENT_STREAMING_STARTED, obs.OBS_FRONTEND_EVENT_RECORDING_STARTED]
+
+    def operation(i: int):
+        on_frontend_event_global(events[i % len(events)])
+
+    return rig, operation
+
+
+def transition_changed_8_devices():
+    rig = Rig(devices=8)
+    transitions = obs.frontend.transitions
+
+    def operation(i: int):
+        obs.obs_frontend_set_current_transition(transitions[i % len(transitions)])
+
+    return rig, operation
+
+
+def transition_settings_properties():
+    rig = Rig(devices=0)
+
+    def operation(i: int):
+        rig.transition_settings.properties(obs.obs_properties_create())
+
+    return rig, operation
+
+
+SCENARIOS = [
+    Scenario("idle_poll", "poll_input with one idle device", idle_poll),
+    Scenario("idle_poll_8", "poll_input with eight idle devices", idle_poll_8_devices),
+    Scenario("cam_cut_storm", "CAM key down/up and flush, cycling CAM1-9", cam_cut_storm),
+    Scenario("cut_mode_keys", "CUT/DIS/SMTH CUT presses and flush", cut_mode_keys),
+    Scenario("jog_spin", "jog report and flush while TRANS DUR is held", jog_spin),
+    Scenario("scenes_1000_cam", "switch_bank_scene and get_current_cam with 1000 scenes", scenes_1000_cam_cut),
+    Scenario("scenes_1000_list", "SCENE_LIST_CHANGED with 1000 scenes", scenes_1000_list_changed),
+    Scenario("scene_changed_8", "SCENE_CHANGED fanned out to eight devices", scene_changed_8_devices),
+    Scenario("unrelated_events_8", "streaming and recording events with eight devices", unrelated_events_8_devices),
+    Scenario("transition_8", "transition change fanned out to eight devices", transition_changed_8_devices),
+    Scenario("transition_properties", "TransitionSettings.properties", transition_settings_properties),
+]
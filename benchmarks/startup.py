@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import argparse
+import os
+import runpy
+import statistics
+import subprocess
+import sys
+import time
+import types
+
+FAKES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fakes")
+PROJECT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Runs in a fresh interpreter, the fakes are imported up front so the bundle can't shadow them
+def child(script: str):
+    sys.path.insert(0, FAKES_DIRECTORY)
+    import hid  # noqa: F401
+    import obspython as obs
+
+    start = time.perf_counter_ns()
+    if script == os.path.join(PROJECT_DIRECTORY, "bmd_obs_plugin.py"):
+        # the real __venv__ would go looking for the pipenv environment
+        sys.modules["__venv__"] = types.SimpleNamespace(activated=True)
+        sys.path.insert(1, PROJECT_DIRECTORY)
+        plugin = vars(__import__("bmd_obs_plugin"))
+    else:
+        plugin = runpy.run_path(script, run_name="bmd_obs_plugin")
+    imported = time.perf_counter_ns()
+    settings = obs.obs_data_create()
+    plugin["script_defaults"](settings)
+    plugin["script_load"](settings)
+    loaded = time.perf_counter_ns()
+    plugin["script_unload"]()
+    print(imported - start, loaded - imported)
+
+
+def measure(script: str, runs: int) -> tuple[float, float]:
+    imports, loads = [], []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-m", "benchmarks.startup", "--child", script],
+                                cwd=PROJECT_DIRECTORY, check=True, capture_output=True, text=True).stdout
+        imported, loaded = output.split()[-2:]
+        imports.append(int(imported))
+        loads.append(int(loaded))
+    return statistics.median(imports) / 1e6, statistics.median(loads) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how long OBS spends importing and loading the script")
+    parser.add_argument("-n", "--runs", type=int, default=20)
+    parser.add_argument("--bundle", help="loader written by tools/bundle.py to compare against the source tree")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    scripts = [("source", os.path.join(PROJECT_DIRECTORY, "bmd_obs_plugin.py"))]
+    if args.bundle:
+        scripts.append(("bundle", os.path.abspath(args.bundle)))
+    print("{0:<12} {1:>12} {2:>12} {3:>12}".format("mode", "import ms", "load ms", "total ms"))
+    for name, script in scripts:
+        imported, loaded = measure(script, args.runs)
+        print("{0:<12} {1:>12.2f} {2:>12.2f} {3:>12.2f}".format(name, imported, loaded, imported + loaded))
+
+
+if __name__ == "__main__":
+    main()
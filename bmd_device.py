@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-import math
-from typing import Optional, Callable
+import queue
+import threading
+import time
+from typing import Optional, Callable, FrozenSet, NamedTuple
 
 import hid
 import obspython as obs
@@ -11,184 +13,415 @@ from bmd_hid_device.jogmode import JogMode
 from bmd_hid_device.protocol.types import BmdHidLed, BmdHidKey, BmdHidJogMode
 from bmd_hid_device.util.deviceinfo import HidDeviceInfo
 
+import log
 from events import frontend_event
+from events.input_event import InputEvent, KeyDownEvent, KeyUpEvent, JogEvent, BatteryEvent, ErrorEvent
+from frontend.scenes import BANK_SIZE
+from frontend.state import FrontendState
+from metrics.counters import DeviceMetrics
+from metrics.latency import KeyPress, LatencyTracker
+from reader import DeviceReader
+from settings.input import InputSettings
 from settings.transitions import TransitionSettings
 from ui_state.cutmode import CutModeHandler
-from util import FRONTEND_EVENT_NAMES
+from ui_state.keymap import Keymap, KeyDispatch
+from ui_state.leds import LedFramebuffer
 
 cam_leds = [BmdHidLed.CAM1, BmdHidLed.CAM2, BmdHidLed.CAM3,
             BmdHidLed.CAM4, BmdHidLed.CAM5, BmdHidLed.CAM6,
             BmdHidLed.CAM7, BmdHidLed.CAM8, BmdHidLed.CAM9]
-cam_keys = [BmdHidKey.CAM1, BmdHidKey.CAM2, BmdHidKey.CAM3,
-            BmdHidKey.CAM4, BmdHidKey.CAM5, BmdHidKey.CAM6,
-            BmdHidKey.CAM7, BmdHidKey.CAM8, BmdHidKey.CAM9]
 all_cam_leds = BmdHidLed.CAM1 | BmdHidLed.CAM2 | BmdHidLed.CAM3 | \
                BmdHidLed.CAM4 | BmdHidLed.CAM5 | BmdHidLed.CAM6 | \
                BmdHidLed.CAM7 | BmdHidLed.CAM8 | BmdHidLed.CAM9
+FRONTEND_EVENTS = {
+    obs.OBS_FRONTEND_EVENT_FINISHED_LOADING,
+    obs.OBS_FRONTEND_EVENT_TRANSITION_CHANGED,
+    obs.OBS_FRONTEND_EVENT_TRANSITION_LIST_CHANGED,
+    obs.OBS_FRONTEND_EVENT_SCENE_CHANGED,
+    obs.OBS_FRONTEND_EVENT_PREVIEW_SCENE_CHANGED,
+    obs.OBS_FRONTEND_EVENT_SCENE_LIST_CHANGED,
+    obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGED,
+}
 
 
-def source_str(source: obs.Source):
-    return "Source(id={0},type={1},name={2})".format(
-        obs.obs_source_get_id(source),
-        obs.obs_source_get_type(source),
-        obs.obs_source_get_name(source)
-    )
+# What an operator would notice losing when the device has to be reopened after a HID error. The LEDs are
+# derived from this and the frontend state, the scenes may well have changed while the device was gone.
+class DeviceSnapshot(NamedTuple):
+    jog_mode: JogMode
+    live_overwrite: bool
+    bank: int
+    cut_modes: list[CutMode]
+    skip_transitions: bool
+
+
+# BmdHidDevice opens its hid.Device itself and doesn't expose it, this one is swapped in meanwhile to count the
+# reports its polls read, whether they run on the OBS thread or the reader's
+class CountingHidDevice(hid.Device):
+    metrics: DeviceMetrics
+
+    def __init__(self, metrics: DeviceMetrics, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = metrics
+
+    def read(self, size: int, timeout: Optional[int] = None) -> bytes:
+        data = super().read(size, timeout)
+        if data:
+            self.metrics.reports += 1
+        return data
 
 
 class ObsBmdDevice(BmdHidDevice):
     jog_mode: JogMode
     live_overwrite: bool
+    bank: int
     duration: Optional[int]
     transitions: TransitionSettings
+    input_settings: InputSettings
+    frontend_state: FrontendState
     cutmode_handler: CutModeHandler
+    framebuffer: LedFramebuffer
+    latency: LatencyTracker
+    metrics: DeviceMetrics
     on_close: Callable[[], None]
+    _events: Optional[queue.SimpleQueue[tuple[int, InputEvent]]]
+    _reader: Optional[DeviceReader]
+    # held while the HID handle is used, the reader thread polls it while the OBS thread writes LEDs and jog modes
+    _hid_lock: threading.RLock
+    _jog_pending: float
+    _jog_applied_ns: int
+    # when the current poll started reading, reports decoded by it count as received then
+    _read_ns: int
+    _frame_interval_ns: int
+    _active: bool
+    _bank_shown: bool
+    _keymap: Optional[Keymap]
+    _dispatch: KeyDispatch
+    _transitions_version: Optional[int]
 
-    def __init__(self, device_info: HidDeviceInfo, transitions: TransitionSettings,
-                 on_close: Callable[[ObsBmdDevice], None]):
+    def __init__(self, device_info: HidDeviceInfo, transitions: TransitionSettings, input_settings: InputSettings,
+                 frontend_state: FrontendState, on_close: Callable[[ObsBmdDevice], None],
+                 metrics: Optional[DeviceMetrics] = None, snapshot: Optional[DeviceSnapshot] = None):
         self.on_close = on_close
-        super().__init__(device_info)
+        self.metrics = metrics if metrics is not None else DeviceMetrics()
+        self._events = None
+        self._reader = None
+        self._hid_lock = threading.RLock()
+        self._jog_pending = 0
+        self._jog_applied_ns = 0
+        self._read_ns = 0
+        self._frame_interval_ns = 0
+        self._active = False
+        self._keymap = None
+        self._dispatch = KeyDispatch({}, {}, {})
+        self._transitions_version = None
+        self.latency = LatencyTracker()
+        hid_device = hid.Device
+        hid.Device = lambda *args, **kwargs: CountingHidDevice(self.metrics, *args, **kwargs)
+        try:
+            super().__init__(device_info)
+        finally:
+            hid.Device = hid_device
         self.transitions = transitions
-        frontend_event.add_frontend_event_listener(self.on_frontend_event)
-        obs.script_log(obs.LOG_INFO, "{0} registered for frontend events".format(self))
-        self.cutmode_handler = CutModeHandler(transitions)
-        with self.leds as leds:
-            leds.clear()
-            self.update_jog_mode(JogMode.SCRL)
+        self.input_settings = input_settings
+        self.frontend_state = frontend_state
+        try:
+            self.cutmode_handler = CutModeHandler(transitions, frontend_state)
+            self.framebuffer = LedFramebuffer(self)
+            self.update_jog_mode(snapshot.jog_mode if snapshot is not None else JogMode.SCRL)
             self.live_overwrite = False
+            self.bank = 0
+            self._bank_shown = False
             self.duration = None
-        self.settings_changed()
+            if snapshot is not None:
+                self._restore(snapshot)
+            self.on_scene_changed()
+            # the restored state, the tally and the current cut mode go out in a single LED report
+            self.settings_changed()
+        except hid.HIDException:
+            # the device went away while we set it up, don't leave its handle open
+            BmdHidDevice.close(self)
+            raise
+        frontend_event.add_frontend_event_listener(self.on_frontend_event, FRONTEND_EVENTS)
+        log.info("{0} registered for frontend events", self)
 
     def close(self):
+        try:
+            self.stop_reader()
+        except hid.HIDException:
+            # the reader stopped on an error, the device is going away either way
+            pass
         frontend_event.remove_frontend_event_listener(self.on_frontend_event)
-        obs.script_log(obs.LOG_INFO, "{0} unregistered for frontend events".format(self))
+        log.info("{0} unregistered for frontend events", self)
         try:
-            self.leds.off(BmdHidLed.TRANS | CutMode.leds() | all_cam_leds | BmdHidLed.LIVE_OWR)
-            self.leds.off(JogMode.leds())
+            self.framebuffer.clear()
+            self.framebuffer.flush()
         except hid.HIDException:
             # we try to disable LEDs if we're still connected, if we're not, just abandon all hope
             pass
         super().close()
         self.on_close(self)
 
+    def snapshot(self) -> DeviceSnapshot:
+        return DeviceSnapshot(self.jog_mode, self.live_overwrite, self.bank, list(self.cutmode_handler.active_modes),
+                              self.cutmode_handler.skip_transitions)
+
+    def _restore(self, snapshot: DeviceSnapshot):
+        self.live_overwrite = snapshot.live_overwrite
+        self.framebuffer.set(BmdHidLed.LIVE_OWR, BmdHidLed.LIVE_OWR if self.live_overwrite else BmdHidLed(0))
+        self.bank = snapshot.bank
+        self.cutmode_handler.active_modes = list(snapshot.cut_modes)
+        self.cutmode_handler.skip_transitions = snapshot.skip_transitions
+        log.info("{0} restored jog mode {1.name}, LIVE O/WR {2}, bank {3}", self, snapshot.jog_mode,
+                 snapshot.live_overwrite, snapshot.bank)
+
+    def start_reader(self):
+        if self._reader is not None:
+            return
+        self._events = queue.SimpleQueue()
+        self._reader = DeviceReader(self, self._events, self._hid_lock)
+        self._reader.start()
+        log.info("{0} started background reader", self)
+
+    def stop_reader(self):
+        if self._reader is None:
+            return
+        self._reader.stop()
+        self._reader = None
+        events = self._events
+        self._events = None
+        log.info("{0} stopped background reader", self)
+        # queued key releases still have to be handled, or TRANS DUR and held keys would stay stuck
+        self._drain(events)
+
+    def drain_events(self):
+        if self._events is not None:
+            self._drain(self._events)
+
+    def _drain(self, events: queue.SimpleQueue[tuple[int, InputEvent]]):
+        while not events.empty():
+            received_ns, event = events.get_nowait()
+            self._handle_event(event, received_ns)
+
+    def poll_available(self):
+        self._read_ns = time.perf_counter_ns()
+        super().poll_available()
+
+    def _submit(self, event: InputEvent):
+        if self._events is not None:
+            self._events.put((self._read_ns, event))
+        else:
+            self._handle_event(event, self._read_ns)
+
+    def _handle_event(self, event: InputEvent, received_ns: int):
+        self._active = True
+        self.metrics.events += 1
+        if isinstance(event, KeyDownEvent):
+            self.metrics.key_presses += 1
+            press = KeyPress(received_ns, time.perf_counter_ns())
+            commands = self.frontend_state.commands
+            commands.origin = press
+            try:
+                self.handle_key_down(event.key)
+            finally:
+                commands.origin = None
+            self.latency.handled(press)
+        elif isinstance(event, KeyUpEvent):
+            self.handle_key_up(event.key)
+        elif isinstance(event, JogEvent):
+            self.metrics.jog_events += 1
+            self.handle_jog_event(event.mode, event.value, event.held_keys)
+        elif isinstance(event, BatteryEvent):
+            self.handle_battery(event.charging, event.level)
+        elif isinstance(event, ErrorEvent):
+            raise event.error
+
+    def take_activity(self) -> bool:
+        active = self._active
+        self._active = False
+        return active
+
+    def busy(self) -> bool:
+        # held keys may be followed by jog input or a release at any moment, TRANS DUR in particular
+        if self.duration is not None or self._jog_pending != 0:
+            return True
+        with self._hid_lock:
+            return len(self.held_keys) > 0
+
+    def flush(self):
+        self._apply_jog()
+        self.flush_leds()
+
+    def flush_leds(self):
+        # all LED changes of one dispatch cycle end up in at most one output report
+        with self._hid_lock:
+            written = self.framebuffer.flush()
+        if written:
+            self.metrics.led_writes += 1
+        self.latency.flushed(written)
+
+    def set_jog_mode(self, mode: BmdHidJogMode):
+        with self._hid_lock:
+            super().set_jog_mode(mode)
+
     def update_jog_mode(self, mode: JogMode):
         self.jog_mode = mode
-        with self.leds as leds:
-            leds.off(JogMode.leds())
-            leds.on(mode.led())
+        self.framebuffer.set(JogMode.leds(), mode.led())
         self.set_jog_mode(mode.mode())
 
     def get_current_cam(self) -> Optional[int]:
-        scenes = obs.obs_frontend_get_scenes()
-        scene_names = [obs.obs_source_get_name(scene) for scene in scenes]
-        obs.source_list_release(scenes)
         if self.live_overwrite:
-            scene = obs.obs_frontend_get_current_scene()
+            index = self.frontend_state.program_index
         else:
-            scene = obs.obs_frontend_get_current_preview_scene()
-        scene_name = obs.obs_source_get_name(scene)
-        obs.obs_source_release(scene)
-        index = scene_names.index(scene_name)
-        if index < 0 or index > len(cam_leds):
+            index = self.frontend_state.preview_index
+        if index is None:
             return None
-        return index
+        slot = index - self.bank * BANK_SIZE
+        if 0 <= slot < BANK_SIZE:
+            return slot
+        return None
 
     def on_scene_changed(self):
+        bank_count = self.frontend_state.scenes.bank_count()
+        if self.bank >= bank_count:
+            self.bank = bank_count - 1
+        if self._bank_shown:
+            # there are only nine LEDs, with more banks they repeat
+            self.framebuffer.set(all_cam_leds, cam_leds[self.bank % len(cam_leds)])
+            return
         index = self.get_current_cam()
-        obs.script_log(obs.LOG_DEBUG, "scene changed, current scene: {0}".format(
-            index + 1
-        ))
-        with self.leds as leds:
-            leds.off(all_cam_leds)
-            if index is not None:
-                leds.on(cam_leds[index])
-
-    def switch_scene(self, id: int):
-        scenes = obs.obs_frontend_get_scenes()
-        if len(scenes) > id:
-            obs.script_log(obs.LOG_DEBUG, "Switching to scene {0} {1}".format(
-                id,
-                source_str(scenes[id])
-            ))
-            obs.obs_frontend_set_current_preview_scene(scenes[id])
-            obs.source_list_release(scenes)
+        log.debug("scene changed, bank {0}, current cam index: {1}", self.bank, index)
+        self.framebuffer.set(all_cam_leds, cam_leds[index] if index is not None else BmdHidLed(0))
+
+    def select_bank(self, bank: int):
+        self.bank = max(0, min(bank, self.frontend_state.scenes.bank_count() - 1))
+        self._bank_shown = True
+        log.debug("selected scene bank {0}", self.bank)
+        self.on_scene_changed()
+
+    def next_bank(self):
+        self.select_bank((self.bank + 1) % self.frontend_state.scenes.bank_count())
+
+    def previous_bank(self):
+        self.select_bank((self.bank - 1) % self.frontend_state.scenes.bank_count())
+
+    def hide_bank(self):
+        self._bank_shown = False
+        self.on_scene_changed()
+
+    def switch_scene(self, index: int):
+        self._switch_to(self.frontend_state.scenes.source(index))
+
+    def switch_bank_scene(self, slot: int):
+        self._switch_to(self.frontend_state.scenes.bank(self.bank)[slot])
+
+    def _switch_to(self, scene: Optional[obs.Source]):
+        if scene is not None:
+            log.debug("Switching to scene {0}", obs.obs_source_get_name(scene))
+            self.frontend_state.set_preview_scene(scene)
             if self.live_overwrite:
-                obs.obs_frontend_preview_program_trigger_transition()
+                self.frontend_state.trigger_transition()
 
     def on_frontend_event(self, event: obs.FrontendEvent):
         if event == obs.OBS_FRONTEND_EVENT_FINISHED_LOADING:
-            self.settings_changed()
-        elif event == obs.OBS_FRONTEND_EVENT_TRANSITION_CHANGED:
-            with self.leds as leds:
-                leds.off(CutModeHandler.all_leds())
-                leds.on(self.cutmode_handler.determine_status())
-        elif event == obs.OBS_FRONTEND_EVENT_SCENE_CHANGED:
-            self.on_scene_changed()
-        elif event == obs.OBS_FRONTEND_EVENT_PREVIEW_SCENE_CHANGED:
-            self.on_scene_changed()
-        elif event == obs.OBS_FRONTEND_EVENT_TRANSITION_DURATION_CHANGED:
-            pass
+            self.refresh()
+        elif event in (obs.OBS_FRONTEND_EVENT_TRANSITION_CHANGED, obs.OBS_FRONTEND_EVENT_TRANSITION_LIST_CHANGED):
+            self.framebuffer.set(CutModeHandler.all_leds(), self.cutmode_handler.determine_status())
         else:
-            obs.script_log(obs.LOG_DEBUG, "on_frontend_event: {0}".format(FRONTEND_EVENT_NAMES[event]))
-
-    def _map_jog_value(self, value: int, pivot: float, curve: float) -> float:
-        sign = math.copysign(1, value)
-        abs = math.fabs(value / 360)
-        mapped_value = pivot * math.pow(abs / pivot, curve)
-        return sign * mapped_value
+            self.on_scene_changed()
+        self.flush_leds()
 
     def on_jog_event(self, mode: BmdHidJogMode, value: int):
-        if BmdHidKey.TRANS_DUR in self.held_keys and self.duration is not None:
-            self.duration += self._map_jog_value(value, 200, 2.2)
-            if self.duration < 50:
-                self.duration = 50
-            if self.duration > 20000:
-                self.duration = 20000
-            obs.obs_frontend_set_transition_duration(int(self.duration))
+        self._submit(JogEvent(mode, value, frozenset(self.held_keys)))
 
     def on_key_down(self, key: BmdHidKey):
-        obs.script_log(obs.LOG_DEBUG, "on_key_down: {0}".format(key.name))
-        if key == BmdHidKey.SHTL:
-            self.update_jog_mode(JogMode.SHTL)
-        elif key == BmdHidKey.JOG:
-            self.update_jog_mode(JogMode.JOG)
-        elif key == BmdHidKey.SCRL:
-            self.update_jog_mode(JogMode.SCRL)
-        elif key in CutMode.keys():
-            with self.leds as leds:
-                leds.off(CutModeHandler.all_leds())
-                leds.on(self.cutmode_handler.set_mode(CutMode.from_key(key)))
-        elif key == BmdHidKey.TRANS:
-            with self.leds as leds:
-                leds.off(CutModeHandler.all_leds())
-                leds.on(self.cutmode_handler.toggle_skip_transitions())
-        elif key == BmdHidKey.TRANS_DUR:
-            self.duration = obs.obs_frontend_get_transition_duration()
-            self.set_jog_mode(BmdHidJogMode.RELATIVE_DEADZONE)
-        elif key in cam_keys:
-            self.switch_scene(cam_keys.index(key))
-        elif key == BmdHidKey.LIVE_OWR:
-            self.live_overwrite = not self.live_overwrite
-            with self.leds as leds:
-                leds.off(BmdHidLed.LIVE_OWR)
-                if self.live_overwrite:
-                    leds.on(BmdHidLed.LIVE_OWR)
-        elif key == BmdHidKey.STOP_PLAY:
-            obs.obs_frontend_preview_program_trigger_transition()
-        else:
-            obs.script_log(obs.LOG_INFO, "Unknown key: {0}".format(key.name))
+        self._submit(KeyDownEvent(key))
 
     def on_key_up(self, key: BmdHidKey):
-        if key == BmdHidKey.TRANS_DUR:
-            self.set_jog_mode(self.jog_mode.mode())
-            self.duration = None
+        self._submit(KeyUpEvent(key))
 
     def on_battery(self, charging: bool, level: int):
-        obs.script_log(obs.LOG_INFO, "battery status changed: charging {0}, level {1}%".format(
-            charging, level
-        ))
+        self._submit(BatteryEvent(charging, level))
+
+    def handle_jog_event(self, mode: BmdHidJogMode, value: int, held_keys: FrozenSet[BmdHidKey]):
+        for key in held_keys:
+            handler = self._dispatch.hold.get(key)
+            if handler is not None:
+                handler(value)
+
+    def _apply_jog(self, force: bool = False):
+        if self._jog_pending == 0 or self.duration is None:
+            return
+        now = time.monotonic_ns()
+        if not force and now - self._jog_applied_ns < self._frame_interval_ns:
+            return
+        self.duration += self._jog_pending
+        self._jog_pending = 0
+        self._jog_applied_ns = now
+        if self.duration < 50:
+            self.duration = 50
+        if self.duration > 20000:
+            self.duration = 20000
+        self.frontend_state.set_transition_duration(int(self.duration))
+
+    def handle_key_down(self, key: BmdHidKey):
+        log.debug("on_key_down: {0.name}", key)
+        handler = self._dispatch.down.get(key)
+        if handler is not None:
+            handler()
+        elif key not in self._dispatch.up and key not in self._dispatch.hold:
+            log.info("Unbound key: {0.name}", key)
+
+    def handle_key_up(self, key: BmdHidKey):
+        handler = self._dispatch.up.get(key)
+        if handler is not None:
+            handler()
+
+    def set_cut_mode(self, mode: CutMode):
+        self.framebuffer.set(CutModeHandler.all_leds(), self.cutmode_handler.set_mode(mode))
+
+    def toggle_skip_transitions(self):
+        self.framebuffer.set(CutModeHandler.all_leds(), self.cutmode_handler.toggle_skip_transitions())
+
+    def toggle_live_overwrite(self):
+        self.live_overwrite = not self.live_overwrite
+        self.framebuffer.set(BmdHidLed.LIVE_OWR, BmdHidLed.LIVE_OWR if self.live_overwrite else BmdHidLed(0))
+
+    def trigger_transition(self):
+        self.frontend_state.trigger_transition()
+
+    def begin_transition_duration(self):
+        self.duration = self.frontend_state.duration
+        self._jog_pending = 0
+        self._frame_interval_ns = obs.obs_get_frame_interval_ns()
+        self.set_jog_mode(BmdHidJogMode.RELATIVE_DEADZONE)
+
+    def adjust_transition_duration(self, value: int):
+        if self.duration is not None:
+            # the curve isn't linear, so every report is mapped on its own and only the sum is deferred to _apply_jog
+            self._jog_pending += self.input_settings.jog_curve().map(value)
+
+    def end_transition_duration(self):
+        self._apply_jog(force=True)
+        self.set_jog_mode(self.jog_mode.mode())
+        self.duration = None
+
+    def handle_battery(self, charging: bool, level: int):
+        self.metrics.charging = charging
+        self.metrics.battery_level = level
+        log.info("battery status changed: charging {0}, level {1}%", charging, level)
 
     def settings_changed(self):
-        obs.script_log(obs.LOG_INFO, "Settings updated")
-        with self.leds as leds:
-            leds.off(CutModeHandler.all_leds())
-            leds.on(self.cutmode_handler.determine_status())
+        keymap = self.input_settings.keymap()
+        if keymap is not self._keymap:
+            self._keymap = keymap
+            self._dispatch = keymap.compile(self)
+        version = self.transitions.snapshot().version
+        if version == self._transitions_version:
+            return
+        self._transitions_version = version
+        log.info("{0} transition settings updated", self)
+        self.refresh()
+
+    def refresh(self):
+        self.framebuffer.set(CutModeHandler.all_leds(), self.cutmode_handler.determine_status())
+        self.flush_leds()
@@ -1,17 +1,39 @@
 from __future__ import annotations
 
+import os
+from typing import Callable, Optional, TYPE_CHECKING
+
 import __venv__ as venv
 import obspython as obs
 
-from devices import DeviceManager
-from events.frontend_event import on_frontend_event_global
+from settings.diagnostics import DiagnosticsSettings
+from settings.input import InputSettings
 from settings.transitions import TransitionSettings
 
+if TYPE_CHECKING:
+    from devices import DeviceManager
+    from frontend.state import FrontendState
+    from metrics.exporter import MetricsExporter
+    from metrics.profiler import CallbackProfiler
+    from scheduler import PollScheduler
+
 if not venv.activated:
     raise RuntimeError("Not running in venv, aborting")
 
 transition_settings = TransitionSettings()
-device_manager = DeviceManager(transition_settings)
+input_settings = InputSettings()
+script_directory = os.path.dirname(os.path.abspath(__file__))
+diagnostics_settings = DiagnosticsSettings(script_directory)
+# OBS blocks its UI while loading scripts, so hid and the device handling are only imported in script_load
+frontend_state: Optional[FrontendState] = None
+device_manager: Optional[DeviceManager] = None
+poll_scheduler: Optional[PollScheduler] = None
+metrics_exporter: Optional[MetricsExporter] = None
+profiler: Optional[CallbackProfiler] = None
+# the profiled wrappers and the bound tick have to be kept, OBS identifies timers and callbacks by the function object
+profiled_update_devices: Optional[Callable[[], None]] = None
+profiled_frontend_event: Optional[Callable[[obs.FrontendEvent], None]] = None
+metrics_tick: Optional[Callable[[], None]] = None
 
 
 def script_description() -> str:
@@ -19,23 +41,77 @@ def script_description() -> str:
 
 
 def script_load(settings: obs.Data):
+    global frontend_state, device_manager, poll_scheduler, metrics_exporter, profiler, \
+        profiled_update_devices, profiled_frontend_event, metrics_tick
+    from devices import DeviceManager
+    from events.frontend_event import on_frontend_event_global, add_frontend_event_listener
+    from frontend.state import FrontendState, EVENTS as FRONTEND_STATE_EVENTS
+    from frontend.transitions import CATALOGUE_EVENTS
+    from metrics.exporter import MetricsExporter
+    from metrics.profiler import CallbackProfiler
+    from scheduler import PollScheduler
+
+    frontend_state = FrontendState()
+    device_manager = DeviceManager(transition_settings, input_settings, frontend_state)
+    profiler = CallbackProfiler(script_directory)
+    profiled_update_devices = profiler.wrap(device_manager.update_devices)
+    profiled_frontend_event = profiler.wrap(on_frontend_event_global)
+    poll_scheduler = PollScheduler(profiler.wrap(device_manager.poll_input), input_settings)
+    metrics_exporter = MetricsExporter(device_manager.metrics_report)
+    metrics_tick = metrics_exporter.tick
+    diagnostics_settings.device_manager = device_manager
+    diagnostics_settings.metrics_exporter = metrics_exporter
+    diagnostics_settings.profiler = profiler
+
+    # registered before any device, so devices always see the updated state
+    add_frontend_event_listener(frontend_state.on_frontend_event, FRONTEND_STATE_EVENTS)
+    add_frontend_event_listener(transition_settings.on_frontend_event, CATALOGUE_EVENTS)
+    frontend_state.refresh()
     transition_settings.update(settings)
+    input_settings.update(settings)
+    diagnostics_settings.update(settings)
     device_manager.settings_changed()
     device_manager.update_devices()
-    obs.timer_add(device_manager.poll_input, 1)
-    obs.timer_add(device_manager.update_devices, 1000)
-    obs.obs_frontend_add_event_callback(on_frontend_event_global)
+    poll_scheduler.start()
+    obs.timer_add(profiled_update_devices, 1000)
+    obs.timer_add(metrics_tick, 1000)
+    obs.obs_frontend_add_event_callback(profiled_frontend_event)
 
 
 def script_unload():
-    obs.timer_remove(device_manager.poll_input)
-    obs.timer_remove(device_manager.update_devices)
-    obs.obs_frontend_remove_event_callback(on_frontend_event_global)
+    global frontend_state, device_manager, poll_scheduler, metrics_exporter, profiler, \
+        profiled_update_devices, profiled_frontend_event, metrics_tick
+    if device_manager is None:
+        return
+    from events.frontend_event import remove_frontend_event_listener
+
+    poll_scheduler.stop()
+    obs.timer_remove(profiled_update_devices)
+    obs.timer_remove(metrics_tick)
+    metrics_exporter.close()
+    obs.obs_frontend_remove_event_callback(profiled_frontend_event)
+    profiler.stop()
     device_manager.close()
+    remove_frontend_event_listener(frontend_state.on_frontend_event)
+    remove_frontend_event_listener(transition_settings.on_frontend_event)
+    frontend_state.release()
+    diagnostics_settings.device_manager = None
+    diagnostics_settings.metrics_exporter = None
+    diagnostics_settings.profiler = None
+    frontend_state = None
+    device_manager = None
+    poll_scheduler = None
+    metrics_exporter = None
+    profiler = None
+    profiled_update_devices = None
+    profiled_frontend_event = None
+    metrics_tick = None
 
 
 def script_defaults(settings: obs.Data):
     transition_settings.defaults(settings)
+    input_settings.defaults(settings)
+    diagnostics_settings.defaults(settings)
 
 
 def script_save(settings: obs.Data):
@@ -44,20 +120,31 @@ def script_save(settings: obs.Data):
 
 def script_update(settings: obs.Data):
     transition_settings.update(settings)
-    device_manager.settings_changed()
-    device_manager.update_devices()
+    input_settings.update(settings)
+    diagnostics_settings.update(settings)
+    # devices only pick up the settings they use and never rescan, hotplug events take care of that
+    if device_manager is not None:
+        device_manager.settings_changed()
 
 
 def script_properties() -> obs.Properties:
     properties = obs.obs_properties_create()
     transition_settings.properties(properties)
+    input_settings.properties(properties)
+    diagnostics_settings.properties(properties)
     return properties
 
 
-def update_devices(): device_manager.update_devices()
+def update_devices():
+    if device_manager is not None:
+        device_manager.update_devices()
 
 
-def poll_input(): device_manager.poll_input()
+def poll_input():
+    if device_manager is not None:
+        device_manager.poll_input()
 
 
-def close(): device_manager.close()
+def close():
+    if device_manager is not None:
+        device_manager.close()
@@ -1,92 +1,269 @@
 from __future__ import annotations
 
-from typing import Tuple
+import time
+from typing import Tuple, Optional, NamedTuple
 
 import hid
-import obspython as obs
 from bmd_hid_device.devices import BmdDevices, VID_BMD
 from bmd_hid_device.util.deviceinfo import HidDeviceInfo
 
-from bmd_device import ObsBmdDevice
+import log
+from bmd_device import ObsBmdDevice, DeviceSnapshot
+from frontend.state import FrontendState
+from hotplug import HotplugWatcher
+from metrics.counters import DeviceMetrics, prometheus_lines, label_value
+from metrics.histogram import LatencyHistogram
+from multiplexer import DeviceMultiplexer
+from settings.input import InputSettings
 from settings.transitions import TransitionSettings
 
+DeviceKey = Tuple[int, int, str]
+
+# delays between reopen attempts after a HID error, brief USB hiccups are over within the first few
+RECONNECT_DELAYS_MS = [2, 5, 10, 20, 50, 100, 200, 500]
+# a device failing again this soon after it was reopened continues its backoff instead of starting over
+RECONNECT_QUIET_NS = 10_000_000_000
+
+
+def device_key(device_info: HidDeviceInfo) -> DeviceKey:
+    return device_info["vendor_id"], device_info["product_id"], device_info["serial_number"]
+
+
+class PendingReconnect(NamedTuple):
+    snapshot: DeviceSnapshot
+    attempt: int
+    due_ns: int
+
 
 class DeviceManager:
-    _devices: list[ObsBmdDevice]
-    _device_infos: list[HidDeviceInfo]
+    _devices: dict[DeviceKey, ObsBmdDevice]
     _transition_settings: TransitionSettings
+    _input_settings: InputSettings
+    _frontend_state: FrontendState
+    _hotplug: Optional[HotplugWatcher]
+    _multiplexer: Optional[DeviceMultiplexer]
+    _metrics: dict[DeviceKey, DeviceMetrics]
+    _opened: set[DeviceKey]
+    # devices whose last open failed, so the failure is only logged once
+    _unopenable: set[DeviceKey]
+    _reconnects: dict[DeviceKey, PendingReconnect]
+    # attempt that reopened the device and when, per device key
+    _reconnected: dict[DeviceKey, tuple[int, int]]
+    _poll_time: LatencyHistogram
 
-    def __init__(self, transition_settings: TransitionSettings):
-        self._devices = []
-        self._device_infos = []
+    def __init__(self, transition_settings: TransitionSettings, input_settings: InputSettings,
+                 frontend_state: FrontendState):
+        self._devices = {}
         self._transition_settings = transition_settings
+        self._input_settings = input_settings
+        self._frontend_state = frontend_state
+        self._hotplug = None
+        self._multiplexer = None
+        self._metrics = {}
+        self._opened = set()
+        self._unopenable = set()
+        self._reconnects = {}
+        self._reconnected = {}
+        self._poll_time = LatencyHistogram()
 
     def close(self):
+        self._reconnects = {}
+        self._reconnected = {}
         self._destroy_devices()
+        if self._hotplug is not None:
+            self._hotplug.close()
+            self._hotplug = None
+        self._update_multiplexer(False)
 
     def _destroy_devices(self):
-        for device in self._devices:
+        for device in list(self._devices.values()):
             device.close()
-        self._devices = []
-
-    def _find_devices(self):
-        tree: dict[Tuple[int, int], dict[str, HidDeviceInfo]] = {}
-        for usb_id in BmdDevices:
-            tree[usb_id] = {}
+        self._devices = {}
 
+    def _find_devices(self) -> dict[DeviceKey, HidDeviceInfo]:
+        result: dict[DeviceKey, HidDeviceInfo] = {}
         entries: list[HidDeviceInfo] = hid.enumerate(vid=VID_BMD)
         for device in entries:
-            usb_id = (device["vendor_id"], device["product_id"])
-            if usb_id in tree:
-                tree[usb_id][device["serial_number"]] = device
-        return [info for device_dict in tree.values() for info in device_dict.values()]
+            if (device["vendor_id"], device["product_id"]) in BmdDevices:
+                result[device_key(device)] = device
+        return result
 
-    def _init_devices(self):
-        for device_info in self._device_infos:
-            try:
-                self._devices.append(ObsBmdDevice(device_info, self._transition_settings, self._on_close))
-            except hid.HIDException:
-                # This means the device was likely removed during connection, let's remove it from the list
-                self._device_infos.remove(device_info)
-        if len(self._device_infos) == 0:
-            obs.script_log(obs.LOG_WARNING, "could not find any BMD device")
+    def _open_device(self, device_info: HidDeviceInfo) -> bool:
+        key = device_key(device_info)
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            metrics = self._metrics[key] = DeviceMetrics()
+        pending = self._reconnects.get(key)
+        try:
+            device = ObsBmdDevice(device_info, self._transition_settings, self._input_settings,
+                                  self._frontend_state, self._on_close, metrics,
+                                  pending.snapshot if pending is not None else None)
+        except hid.HIDException as e:
+            metrics.hid_errors += 1
+            # Either the device was removed during connection or we may not open it, usually for lack of a udev
+            # rule. Enumerating again right away wouldn't help, the hotplug watcher reports removals as well as
+            # permission changes.
+            if key not in self._unopenable:
+                log.warning("Could not open {0}, retrying once its device node changes: {1}", key, e)
+                self._unopenable.add(key)
+            return False
+        self._unopenable.discard(key)
+        if self._input_settings.threaded():
+            device.start_reader()
+        if self._multiplexer is not None:
+            self._multiplexer.register(device)
+        self._devices[key] = device
+        self._reconnects.pop(key, None)
+        if key in self._opened:
+            metrics.reconnects += 1
+        self._opened.add(key)
+        metrics.connected = True
+        return True
+
+    def _schedule_reconnect(self, device: ObsBmdDevice) -> int:
+        key = device_key(device.device_info())
+        now = time.monotonic_ns()
+        attempt = 0
+        reconnected = self._reconnected.pop(key, None)
+        if reconnected is not None and now - reconnected[1] < RECONNECT_QUIET_NS:
+            attempt = min(reconnected[0] + 1, len(RECONNECT_DELAYS_MS) - 1)
+        self._reconnects[key] = PendingReconnect(device.snapshot(), attempt,
+                                                 now + RECONNECT_DELAYS_MS[attempt] * 1_000_000)
+        return attempt
+
+    def _retry_reconnects(self):
+        now = time.monotonic_ns()
+        for key, pending in list(self._reconnects.items()):
+            if now < pending.due_ns:
+                continue
+            # the device may come back under a different path, so look it up by its serial
+            for device_info in hid.enumerate(vid=key[0], pid=key[1]):
+                if device_key(device_info) == key and self._open_device(device_info):
+                    log.info("Reconnected {0} after {1} attempts", key, pending.attempt + 1)
+                    self._reconnected[key] = (pending.attempt, now)
+                    break
+            else:
+                attempt = pending.attempt + 1
+                if attempt < len(RECONNECT_DELAYS_MS):
+                    self._reconnects[key] = pending._replace(
+                        attempt=attempt, due_ns=now + RECONNECT_DELAYS_MS[attempt] * 1_000_000)
+                else:
+                    log.warning("Could not reconnect {0}, waiting for it to be plugged in again", key)
+                    del self._reconnects[key]
+
+    def _device_failed(self, device: ObsBmdDevice, error: hid.HIDException):
+        device.metrics.hid_errors += 1
+        attempt = self._schedule_reconnect(device)
+        if attempt == 0:
+            log.error("Error communicating with device: {0}", error)
+        else:
+            # the error and the trace leading up to it were logged when the device first failed
+            log.warning("Error communicating with device again after reconnecting, retrying in {0} ms: {1}",
+                        RECONNECT_DELAYS_MS[attempt], error)
+        device.close()
+        self._invalidate_devices()
 
     def _on_close(self, device: ObsBmdDevice):
-        if device in self._devices:
-            self._devices.remove(device)
-        if device.device_info() in self._device_infos:
-            self._device_infos.remove(device.device_info())
+        key = device_key(device.device_info())
+        if self._devices.get(key) is device:
+            del self._devices[key]
+            device.metrics.connected = False
+        if self._multiplexer is not None:
+            self._multiplexer.unregister(device)
+
+    def _invalidate_devices(self):
+        # a device we dropped may still be attached, make sure the next update enumerates again
+        if self._hotplug is not None:
+            self._hotplug.invalidate()
 
     def update_devices(self):
+        if self._hotplug is None:
+            self._hotplug = HotplugWatcher()
+        if not self._hotplug.changed():
+            return
         device_infos = self._find_devices()
-        if self._device_infos != device_infos:
-            self._device_infos = device_infos
-        current_devices = [device.device_info() for device in self._devices]
-        if current_devices != device_infos:
-            obs.script_log(obs.LOG_INFO, "Device list has changed: from {0} to {1}".format(
-                [(i["vendor_id"], i["product_id"], i["serial_number"]) for i in device_infos],
-                [(i["vendor_id"], i["product_id"], i["serial_number"]) for i in current_devices],
-            ))
-            self._destroy_devices()
-            self._init_devices()
-
-    def poll_input(self):
-        for device in self._devices:
+        if len(device_infos) == 0:
+            log.warning("could not find any BMD device")
+        # a device that was replugged between two updates keeps its key but gets a new path
+        removed = [key for key, device in self._devices.items()
+                   if key not in device_infos or device_infos[key]["path"] != device.device_info()["path"]]
+        added = [key for key in device_infos if key not in self._devices or key in removed]
+        if not removed and not added:
+            return
+        log.info("Device list has changed: added {0}, removed {1}", added, removed)
+        for key in removed:
+            self._devices[key].close()
+        for key in added:
+            self._open_device(device_infos[key])
+
+    def poll_input(self) -> bool:
+        start_ns = time.perf_counter_ns()
+        active = False
+        if self._multiplexer is not None:
+            devices = self._multiplexer.ready()
+        else:
+            devices = list(self._devices.values())
+        for device in devices:
             if device.isclosed():
-                if device in self._devices:
-                    self._devices.remove(device)
-                if device.device_info() in self._device_infos:
-                    self._device_infos.remove(device.device_info())
+                self._on_close(device)
+                self._invalidate_devices()
+                continue
             try:
-                device.poll_available()
+                if self._input_settings.threaded():
+                    device.drain_events()
+                else:
+                    device.poll_available()
+                device.flush()
             except hid.HIDException as e:
-                obs.script_log(obs.LOG_ERROR, "Error communicating with device: {0}".format(e))
-                device.close()
-                if device in self._devices:
-                    self._devices.remove(device)
-                if device.device_info() in self._device_infos:
-                    self._device_infos.remove(device.device_info())
+                self._device_failed(device, e)
+                continue
+            if device.take_activity() or device.busy():
+                active = True
+                if self._multiplexer is not None:
+                    # pending jog input and held keys still need flushing without new reports
+                    self._multiplexer.keep(device)
+        if self._reconnects:
+            self._retry_reconnects()
+            active = True
+        if self._frontend_state.commands.flush():
+            active = True
+        self._poll_time.record((time.perf_counter_ns() - start_ns) // 1000)
+        return active
+
+    def metrics_report(self) -> list[str]:
+        devices = {'vendor="{0:04x}",product="{1:04x}",serial="{2}"'.format(vendor_id, product_id, label_value(serial)):
+                   metrics for (vendor_id, product_id, serial), metrics in self._metrics.items()}
+        return prometheus_lines(devices, self._poll_time)
+
+    def latency_report(self, detailed: bool = False) -> list[str]:
+        lines = []
+        for key, device in self._devices.items():
+            lines.append("{0:04x}:{1:04x} {2}".format(*key))
+            lines.extend("  " + line for line in device.latency.summary(detailed))
+        return lines
+
+    def reset_latency(self):
+        for device in self._devices.values():
+            device.latency.reset()
+
+    def _update_multiplexer(self, enabled: bool):
+        if enabled and self._multiplexer is None:
+            self._multiplexer = DeviceMultiplexer()
+            for device in self._devices.values():
+                self._multiplexer.register(device)
+        elif not enabled and self._multiplexer is not None:
+            self._multiplexer.close()
+            self._multiplexer = None
 
     def settings_changed(self):
-        for device in self._devices:
-            device.settings_changed()
+        self._update_multiplexer(self._input_settings.multiplexed())
+        for device in list(self._devices.values()):
+            try:
+                if self._input_settings.threaded():
+                    device.start_reader()
+                else:
+                    # handles what the reader queued last, which may be the error that stopped it
+                    device.stop_reader()
+                device.settings_changed()
+            except hid.HIDException as e:
+                self._device_failed(device, e)
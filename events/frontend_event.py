@@ -1,22 +1,49 @@
 from __future__ import annotations
 
-from typing import Callable
+from typing import Callable, Iterable, Optional
 
 import obspython as obs
 
-_listeners: list[Callable[[obs.FrontendEvent], None]] = []
+import log
+from util import FrontendEventName
+
+FrontendEventListener = Callable[[obs.FrontendEvent], None]
+
+# registration order is dispatch order, listeners without events receive everything
+_listeners: list[tuple[FrontendEventListener, Optional[frozenset[obs.FrontendEvent]]]] = []
+# built per event on first dispatch, OBS emits many events nobody here is interested in
+_dispatch: dict[obs.FrontendEvent, tuple[FrontendEventListener, ...]] = {}
+# bumped on every removal, so a dispatch in progress notices listeners that went away under it
+_removals = 0
 
 
 def on_frontend_event_global(event: obs.FrontendEvent):
-    for listener in _listeners:
+    listeners = _dispatch.get(event)
+    if listeners is None:
+        log.debug("first frontend event {0}", FrontendEventName(event))
+        listeners = _dispatch[event] = tuple(
+            listener for listener, events in _listeners if events is None or event in events)
+    removals = _removals
+    for listener in listeners:
+        # an earlier listener may have removed this one, by closing its device for example
+        if removals != _removals and not any(registered == listener for registered, _ in _listeners):
+            continue
         listener(event)
 
 
-def add_frontend_event_listener(listener: Callable[[obs.FrontendEvent], None]):
-    if listener not in _listeners:
-        _listeners.append(listener)
+def add_frontend_event_listener(listener: FrontendEventListener,
+                                events: Optional[Iterable[obs.FrontendEvent]] = None):
+    if any(registered == listener for registered, _ in _listeners):
+        return
+    _listeners.append((listener, frozenset(events) if events is not None else None))
+    _dispatch.clear()
 
 
-def remove_frontend_event_listener(listener: Callable[[obs.FrontendEvent], None]):
-    if listener in _listeners:
-        _listeners.remove(listener)
+def remove_frontend_event_listener(listener: FrontendEventListener):
+    global _removals
+    for i, (registered, _) in enumerate(_listeners):
+        if registered == listener:
+            del _listeners[i]
+            _dispatch.clear()
+            _removals += 1
+            return
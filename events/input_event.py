@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import NamedTuple, Union, FrozenSet
+
+from bmd_hid_device.protocol.types import BmdHidKey, BmdHidJogMode
+
+
+class KeyDownEvent(NamedTuple):
+    key: BmdHidKey
+
+
+class KeyUpEvent(NamedTuple):
+    key: BmdHidKey
+
+
+class JogEvent(NamedTuple):
+    mode: BmdHidJogMode
+    value: int
+    # keys held when the report was decoded, the reader may have seen them released by the time this is handled
+    held_keys: FrozenSet[BmdHidKey]
+
+
+class BatteryEvent(NamedTuple):
+    charging: bool
+    level: int
+
+
+class ErrorEvent(NamedTuple):
+    error: Exception
+
+
+InputEvent = Union[KeyDownEvent, KeyUpEvent, JogEvent, BatteryEvent, ErrorEvent]
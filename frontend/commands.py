@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, NamedTuple, Optional, Union, TYPE_CHECKING
+
+import obspython as obs
+
+import log
+
+if TYPE_CHECKING:
+    from metrics.latency import KeyPress
+
+
+class SetPreviewScene(NamedTuple):
+    scene: obs.Source
+
+
+class SetTransition(NamedTuple):
+    index: int
+    transition: obs.Source
+
+
+class SetTransitionDuration(NamedTuple):
+    duration: int
+
+
+class TriggerTransition(NamedTuple):
+    pass
+
+
+Command = Union[SetPreviewScene, SetTransition, SetTransitionDuration, TriggerTransition]
+
+
+def reduce_commands(commands: list[Command]) -> list[Command]:
+    # only the last command of each kind matters until the next transition is triggered
+    result: list[Command] = []
+    segment: dict[type, Command] = {}
+    for command in commands:
+        if isinstance(command, TriggerTransition):
+            result.extend(segment.values())
+            result.append(command)
+            segment = {}
+        else:
+            segment.pop(type(command), None)
+            segment[type(command)] = command
+    result.extend(segment.values())
+    return result
+
+
+# Input handlers queue their OBS calls here, they are reduced and executed at most once per frame
+class CommandQueue:
+    _pending: list[Command]
+    _executed_ns: int
+    _current_transition: Callable[[], Optional[int]]
+    # OBS reports transition changes asynchronously, until it has caught up this is the transition it will end up with
+    _issued_transition: Optional[int]
+    # the key press whose handler is running, what it submits is timed as part of it
+    origin: Optional[KeyPress]
+    _origins: list[KeyPress]
+
+    def __init__(self, current_transition: Callable[[], Optional[int]]):
+        self._pending = []
+        self._executed_ns = 0
+        self._current_transition = current_transition
+        self._issued_transition = None
+        self.origin = None
+        self._origins = []
+
+    def submit(self, command: Command):
+        self._pending.append(command)
+        if self.origin is not None:
+            if not self.origin.commands:
+                self._origins.append(self.origin)
+            self.origin.commands += 1
+
+    def pending(self) -> bool:
+        return len(self._pending) > 0
+
+    def clear(self):
+        self._pending = []
+        self._issued_transition = None
+        for press in self._origins:
+            press.discarded = True
+        self._origins = []
+
+    def transition_changed(self):
+        # from here on the reported transition is newer than anything issued before
+        self._issued_transition = None
+
+    def flush(self, force: bool = False) -> bool:
+        if not self._pending:
+            return False
+        now = time.monotonic_ns()
+        # the first command after a quiet frame runs right away, only bursts wait for the next frame
+        if not force and now - self._executed_ns < obs.obs_get_frame_interval_ns():
+            return True
+        commands = reduce_commands(self._pending)
+        log.debug("executing {0} of {1} queued OBS commands", len(commands), len(self._pending))
+        self._pending = []
+        self._executed_ns = now
+        origins = self._origins
+        self._origins = []
+        issued_ns = time.perf_counter_ns()
+        for press in origins:
+            press.issued_ns = issued_ns
+        for command in commands:
+            self._execute(command)
+        if origins:
+            returned_ns = time.perf_counter_ns()
+            for press in origins:
+                press.returned_ns = returned_ns
+        return False
+
+    def _execute(self, command: Command):
+        if isinstance(command, SetPreviewScene):
+            obs.obs_frontend_set_current_preview_scene(command.scene)
+        elif isinstance(command, SetTransition):
+            current = self._issued_transition if self._issued_transition is not None else self._current_transition()
+            if command.index != current:
+                obs.obs_frontend_set_current_transition(command.transition)
+                self._issued_transition = command.index
+        elif isinstance(command, SetTransitionDuration):
+            obs.obs_frontend_set_transition_duration(command.duration)
+        elif isinstance(command, TriggerTransition):
+            obs.obs_frontend_preview_program_trigger_transition()
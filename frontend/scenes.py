@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import obspython as obs
+
+# CAM1 through CAM9 page through the scene list in banks of this size
+BANK_SIZE = 9
+# Events after which the scene list may differ. The collection events also make us drop our references,
+# otherwise OBS can't free the sources of the old collection.
+INVALIDATING_EVENTS = {
+    obs.OBS_FRONTEND_EVENT_SCENE_LIST_CHANGED,
+    obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGING,
+    obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CLEANUP,
+    obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGED,
+    obs.OBS_FRONTEND_EVENT_EXIT,
+}
+
+
+class SceneIndex:
+    _scenes: Optional[list[obs.Source]]
+    _names: list[str]
+    _indices: dict[str, int]
+    _banks: dict[int, list[Optional[obs.Source]]]
+
+    def __init__(self):
+        self._scenes = None
+        self._names = []
+        self._indices = {}
+        self._banks = {}
+
+    def on_frontend_event(self, event: obs.FrontendEvent):
+        if event in INVALIDATING_EVENTS:
+            self.invalidate()
+
+    def invalidate(self):
+        if self._scenes is not None:
+            obs.source_list_release(self._scenes)
+        self._scenes = None
+        self._names = []
+        self._indices = {}
+        self._banks = {}
+
+    def _ensure(self) -> list[obs.Source]:
+        if self._scenes is None:
+            # we keep the list and the references it holds until the next invalidation
+            self._scenes = obs.obs_frontend_get_scenes()
+            self._names = [obs.obs_source_get_name(scene) for scene in self._scenes]
+            self._indices = {}
+            for index, name in enumerate(self._names):
+                self._indices.setdefault(name, index)
+        return self._scenes
+
+    def __len__(self) -> int:
+        return len(self._ensure())
+
+    def index_of(self, name: str) -> Optional[int]:
+        self._ensure()
+        return self._indices.get(name)
+
+    def name(self, index: int) -> Optional[str]:
+        self._ensure()
+        if 0 <= index < len(self._names):
+            return self._names[index]
+        return None
+
+    def source(self, index: int) -> Optional[obs.Source]:
+        scenes = self._ensure()
+        if 0 <= index < len(scenes):
+            return scenes[index]
+        return None
+
+    def bank_count(self) -> int:
+        return max(1, -(-len(self._ensure()) // BANK_SIZE))
+
+    def bank(self, bank: int) -> list[Optional[obs.Source]]:
+        pool = self._banks.get(bank)
+        if pool is None:
+            # borrows the references of the scene list, so it is dropped together with it
+            scenes = self._ensure()[bank * BANK_SIZE:(bank + 1) * BANK_SIZE]
+            pool = self._banks[bank] = scenes + [None] * (BANK_SIZE - len(scenes))
+        return pool
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import obspython as obs
+
+from frontend.commands import CommandQueue, SetPreviewScene, SetTransition, SetTransitionDuration, \
+    TriggerTransition
+from frontend.scenes import SceneIndex, INVALIDATING_EVENTS as SCENE_INDEX_EVENTS
+from frontend.transitions import TransitionRegistry, INVALIDATING_EVENTS as TRANSITION_REGISTRY_EVENTS
+
+SCENE_EVENTS = {
+    obs.OBS_FRONTEND_EVENT_SCENE_CHANGED,
+    obs.OBS_FRONTEND_EVENT_PREVIEW_SCENE_CHANGED,
+    obs.OBS_FRONTEND_EVENT_SCENE_LIST_CHANGED,
+    obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGED,
+    obs.OBS_FRONTEND_EVENT_STUDIO_MODE_ENABLED,
+    obs.OBS_FRONTEND_EVENT_STUDIO_MODE_DISABLED,
+    obs.OBS_FRONTEND_EVENT_FINISHED_LOADING,
+}
+TRANSITION_EVENTS = {
+    obs.OBS_FRONTEND_EVENT_TRANSITION_CHANGED,
+    obs.OBS_FRONTEND_EVENT_TRANSITION_LIST_CHANGED,
+    obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGED,
+    obs.OBS_FRONTEND_EVENT_FINISHED_LOADING,
+}
+DURATION_EVENTS = {
+    obs.OBS_FRONTEND_EVENT_TRANSITION_DURATION_CHANGED,
+    obs.OBS_FRONTEND_EVENT_FINISHED_LOADING,
+}
+EVENTS = SCENE_EVENTS | TRANSITION_EVENTS | DURATION_EVENTS | \
+         SCENE_INDEX_EVENTS | TRANSITION_REGISTRY_EVENTS
+
+
+def _source_name(source: Optional[obs.Source]) -> Optional[str]:
+    if source is None:
+        return None
+    name = obs.obs_source_get_name(source)
+    obs.obs_source_release(source)
+    return name
+
+
+# Updated once per frontend event and shared by all devices, so the work per event doesn't grow with device count
+class FrontendState:
+    scenes: SceneIndex
+    transitions: TransitionRegistry
+    commands: CommandQueue
+    program_scene: Optional[str]
+    preview_scene: Optional[str]
+    program_index: Optional[int]
+    preview_index: Optional[int]
+    transition_index: Optional[int]
+    duration: int
+
+    def __init__(self):
+        self.scenes = SceneIndex()
+        self.transitions = TransitionRegistry()
+        self.commands = CommandQueue(lambda: self.transition_index)
+        self.program_scene = None
+        self.preview_scene = None
+        self.program_index = None
+        self.preview_index = None
+        self.transition_index = None
+        self.duration = 0
+
+    def on_frontend_event(self, event: obs.FrontendEvent):
+        if event in SCENE_INDEX_EVENTS or event in TRANSITION_REGISTRY_EVENTS:
+            # queued commands borrow their sources from the lists that are about to be released
+            self.commands.clear()
+        self.scenes.on_frontend_event(event)
+        self.transitions.on_frontend_event(event)
+        if event in SCENE_EVENTS:
+            self._update_scenes()
+        if event in TRANSITION_EVENTS:
+            self.commands.transition_changed()
+            self._update_transition()
+        if event in DURATION_EVENTS:
+            self._update_duration()
+
+    def refresh(self):
+        self._update_scenes()
+        self._update_transition()
+        self._update_duration()
+
+    def release(self):
+        self.commands.clear()
+        self.scenes.invalidate()
+        self.transitions.invalidate()
+
+    def _update_scenes(self):
+        self.program_scene = _source_name(obs.obs_frontend_get_current_scene())
+        self.preview_scene = _source_name(obs.obs_frontend_get_current_preview_scene())
+        self.program_index = self.scenes.index_of(self.program_scene) if self.program_scene is not None else None
+        self.preview_index = self.scenes.index_of(self.preview_scene) if self.preview_scene is not None else None
+
+    def _update_transition(self):
+        self.transition_index = self.transitions.current_index()
+
+    def _update_duration(self):
+        self.duration = obs.obs_frontend_get_transition_duration()
+
+    def set_preview_scene(self, scene: obs.Source):
+        self.commands.submit(SetPreviewScene(scene))
+
+    def trigger_transition(self):
+        self.commands.submit(TriggerTransition())
+
+    def set_transition(self, index: int) -> bool:
+        transition = self.transitions.source(index)
+        if transition is None:
+            return False
+        self.commands.submit(SetTransition(index, transition))
+        return True
+
+    def set_transition_duration(self, duration: int):
+        self.commands.submit(SetTransitionDuration(duration))
+        self.duration = duration
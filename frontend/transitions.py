@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import obspython as obs
+
+# Transitions are stored with the scene collection, so collection changes invalidate them as well
+INVALIDATING_EVENTS = {
+    obs.OBS_FRONTEND_EVENT_TRANSITION_LIST_CHANGED,
+    obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGING,
+    obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CLEANUP,
+    obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGED,
+    obs.OBS_FRONTEND_EVENT_EXIT,
+}
+# the catalogue the settings are built from may have been loaded before OBS finished loading the collection
+CATALOGUE_EVENTS = INVALIDATING_EVENTS | {obs.OBS_FRONTEND_EVENT_FINISHED_LOADING}
+
+
+# Names and ids only, without source references, so the settings can keep it around for as long as they like
+class TransitionCatalogue:
+    names: list[str]
+    ids: list[str]
+    _indices_by_id: dict[str, int]
+
+    def __init__(self, names: list[str], ids: list[str]):
+        self.names = names
+        self.ids = ids
+        self._indices_by_id = {}
+        for index, transition_id in enumerate(ids):
+            self._indices_by_id.setdefault(transition_id, index)
+
+    @staticmethod
+    def load() -> TransitionCatalogue:
+        transitions = obs.obs_frontend_get_transitions()
+        names = [obs.obs_source_get_name(transition) for transition in transitions]
+        ids = [obs.obs_source_get_id(transition) for transition in transitions]
+        obs.source_list_release(transitions)
+        return TransitionCatalogue(names, ids)
+
+    def index_of_id(self, transition_id: str) -> Optional[int]:
+        return self._indices_by_id.get(transition_id)
+
+
+class TransitionRegistry:
+    _transitions: Optional[list[obs.Source]]
+    _indices: dict[str, int]
+
+    def __init__(self):
+        self._transitions = None
+        self._indices = {}
+
+    def on_frontend_event(self, event: obs.FrontendEvent):
+        if event in INVALIDATING_EVENTS:
+            self.invalidate()
+
+    def invalidate(self):
+        if self._transitions is not None:
+            obs.source_list_release(self._transitions)
+        self._transitions = None
+        self._indices = {}
+
+    def _ensure(self) -> list[obs.Source]:
+        if self._transitions is None:
+            self._transitions = obs.obs_frontend_get_transitions()
+            self._indices = {}
+            for index, transition in enumerate(self._transitions):
+                self._indices.setdefault(obs.obs_source_get_name(transition), index)
+        return self._transitions
+
+    def __len__(self) -> int:
+        return len(self._ensure())
+
+    def index_of(self, name: str) -> Optional[int]:
+        self._ensure()
+        return self._indices.get(name)
+
+    def current_index(self) -> Optional[int]:
+        current_transition = obs.obs_frontend_get_current_transition()
+        if current_transition is None:
+            return None
+        current_transition_name = obs.obs_source_get_name(current_transition)
+        obs.obs_source_release(current_transition)
+        return self.index_of(current_transition_name)
+
+    def source(self, index: int) -> Optional[obs.Source]:
+        transitions = self._ensure()
+        if 0 <= index < len(transitions):
+            return transitions[index]
+        return None
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from typing import Optional
+
+import log
+
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+# permissions are applied by udev after the node is created, so attribute changes have to count as well
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO
+
+_event_header = struct.Struct("iIII")
+
+
+class HotplugWatcher:
+    _directory: str
+    _prefix: bytes
+    _fd: Optional[int]
+    _dirty: bool
+
+    def __init__(self, directory: str = "/dev", prefix: str = "hidraw"):
+        self._directory = directory
+        self._prefix = prefix.encode()
+        self._fd = None
+        # the first check always has to enumerate
+        self._dirty = True
+        if sys.platform.startswith("linux"):
+            self._fd = self._open()
+        if self._fd is None:
+            log.info("hotplug notifications unavailable, falling back to polling")
+
+    def _open(self) -> Optional[int]:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        except OSError:
+            return None
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(self._directory), WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+
+    def available(self) -> bool:
+        return self._fd is not None
+
+    def invalidate(self):
+        self._dirty = True
+
+    def changed(self) -> bool:
+        if self._fd is None:
+            return True
+        self._read_events()
+        dirty = self._dirty
+        self._dirty = False
+        return dirty
+
+    def _read_events(self):
+        while True:
+            try:
+                data = os.read(self._fd, 4096)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                log.warning("hotplug watcher failed, falling back to polling: {0}", e)
+                self.close()
+                return
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _event_header.unpack_from(data, offset)
+                offset += _event_header.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW or name.startswith(self._prefix):
+                    self._dirty = True
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+
+import obspython as obs
+
+TRACE_SIZE = 1024
+
+# Debug records are always kept, unformatted, formatting only happens when they are actually written out
+_trace: deque[tuple[float, str, tuple]] = deque(maxlen=TRACE_SIZE)
+_debug = False
+
+
+def set_debug(enabled: bool):
+    global _debug
+    _debug = enabled
+
+
+def _format(message: str, args: tuple) -> str:
+    if not args:
+        return message
+    try:
+        return message.format(*args)
+    except Exception as e:
+        return "{0} {1!r} (format failed: {2})".format(message, args, e)
+
+
+def debug(message: str, *args):
+    _trace.append((time.time(), message, args))
+    if _debug:
+        obs.script_log(obs.LOG_DEBUG, _format(message, args))
+
+
+def info(message: str, *args):
+    obs.script_log(obs.LOG_INFO, _format(message, args))
+
+
+def warning(message: str, *args):
+    obs.script_log(obs.LOG_WARNING, _format(message, args))
+
+
+def error(message: str, *args):
+    # whatever led up to an error is the interesting part of the trace
+    flush_trace()
+    obs.script_log(obs.LOG_ERROR, _format(message, args))
+
+
+def flush_trace():
+    records = list(_trace)
+    _trace.clear()
+    for timestamp, message, args in records:
+        obs.script_log(obs.LOG_INFO, "[trace {0}.{1:03d}] {2}".format(
+            time.strftime("%H:%M:%S", time.localtime(timestamp)), int(timestamp * 1000) % 1000,
+            _format(message, args)))
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from metrics.histogram import LatencyHistogram
+
+# name, type, help, DeviceMetrics attribute
+DEVICE_METRICS = [
+    ("bmd_device_connected", "gauge", "Whether the device is currently open", "connected"),
+    ("bmd_device_reports_read_total", "counter", "Input reports read from the device", "reports"),
+    ("bmd_device_input_events_total", "counter", "Key, jog and battery events handled", "events"),
+    ("bmd_device_key_presses_total", "counter", "Keys pressed", "key_presses"),
+    ("bmd_device_jog_events_total", "counter", "Jog wheel reports handled", "jog_events"),
+    ("bmd_device_led_writes_total", "counter", "LED output reports written", "led_writes"),
+    ("bmd_device_hid_errors_total", "counter", "HID errors while opening or reading the device", "hid_errors"),
+    ("bmd_device_reconnects_total", "counter", "Times the device was opened again after it was closed", "reconnects"),
+    ("bmd_device_battery_level_percent", "gauge", "Battery level reported by the device", "battery_level"),
+    ("bmd_device_battery_charging", "gauge", "Whether the device reported it is charging", "charging"),
+]
+POLL_QUANTILES = [0.5, 0.9, 0.99, 1.0]
+
+
+# Kept by the device manager per device key, so the counters survive reconnects
+class DeviceMetrics:
+    connected: bool
+    reports: int
+    events: int
+    key_presses: int
+    jog_events: int
+    led_writes: int
+    hid_errors: int
+    reconnects: int
+    battery_level: Optional[int]
+    charging: Optional[bool]
+
+    def __init__(self):
+        self.connected = False
+        self.reports = 0
+        self.events = 0
+        self.key_presses = 0
+        self.jog_events = 0
+        self.led_writes = 0
+        self.hid_errors = 0
+        self.reconnects = 0
+        self.battery_level = None
+        self.charging = None
+
+
+def label_value(value: str) -> str:
+    # the text format only knows these three escapes, serials come straight from the device descriptor
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_lines(devices: dict[str, DeviceMetrics], poll_time: LatencyHistogram) -> list[str]:
+    lines = []
+    for name, kind, description, attribute in DEVICE_METRICS:
+        lines.append("# HELP {0} {1}".format(name, description))
+        lines.append("# TYPE {0} {1}".format(name, kind))
+        for labels, metrics in devices.items():
+            value = getattr(metrics, attribute)
+            # battery values are only known once the device reported them
+            if value is not None:
+                lines.append("{0}{{{1}}} {2}".format(name, labels, int(value)))
+    lines.append("# HELP bmd_poll_duration_seconds Time spent in one input poll cycle of all devices")
+    lines.append("# TYPE bmd_poll_duration_seconds summary")
+    for quantile in POLL_QUANTILES:
+        lines.append('bmd_poll_duration_seconds{{quantile="{0}"}} {1:.6f}'.format(
+            quantile, poll_time.percentile(quantile * 100) / 1e6))
+    lines.append("bmd_poll_duration_seconds_sum {0:.6f}".format(poll_time.total / 1e6))
+    lines.append("bmd_poll_duration_seconds_count {0}".format(poll_time.count))
+    return lines
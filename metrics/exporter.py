@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import Callable, Optional, TYPE_CHECKING
+
+import log
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# The metrics are rendered on the OBS thread and only the finished text is handed to the server thread,
+# so scrapes never touch the devices while they are being polled.
+class MetricsExporter:
+    _collect: Callable[[], list[str]]
+    _snapshot: bytes
+    _port: int
+    _path: str
+    _server: Optional[ThreadingHTTPServer]
+    _thread: Optional[threading.Thread]
+    # failures are retried on every tick, but only logged when they start
+    _server_failed: bool
+    _file_failed: bool
+
+    def __init__(self, collect: Callable[[], list[str]]):
+        self._collect = collect
+        self._snapshot = b""
+        self._port = 0
+        self._path = ""
+        self._server = None
+        self._thread = None
+        self._server_failed = False
+        self._file_failed = False
+
+    def configure(self, port: int, path: str):
+        if port != self._port:
+            self._stop_server()
+            self._port = port
+            self._server_failed = False
+        if path != self._path:
+            self._path = path
+            self._file_failed = False
+        self.tick()
+
+    def _start_server(self, port: int):
+        # http.server pulls in half the standard library, most setups never enable the endpoint
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                snapshot = exporter._snapshot
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(snapshot)))
+                self.end_headers()
+                self.wfile.write(snapshot)
+
+            def log_message(self, format: str, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        except OSError as e:
+            if not self._server_failed:
+                log.warning("Could not serve metrics on port {0}, retrying: {1}", port, e)
+                self._server_failed = True
+            return
+        self._server_failed = False
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="bmd-metrics", daemon=True)
+        self._thread.start()
+        log.info("Serving metrics on http://127.0.0.1:{0}/metrics", port)
+
+    def _stop_server(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(timeout=1)
+        self._server = None
+        self._thread = None
+
+    def tick(self):
+        if self._server is None and self._port > 0:
+            # also retries a port that was taken by something that has since gone away
+            self._start_server(self._port)
+        if self._server is None and not self._path:
+            return
+        self._snapshot = ("\n".join(self._collect()) + "\n").encode()
+        if self._path:
+            self._write_file(self._path)
+
+    def _write_file(self, path: str):
+        # written next to the target and renamed, so collectors never read a partial file
+        temporary_path = path + ".tmp"
+        try:
+            with open(temporary_path, "wb") as file:
+                file.write(self._snapshot)
+            os.replace(temporary_path, path)
+        except OSError as e:
+            if not self._file_failed:
+                log.warning("Could not write metrics to {0}, retrying: {1}", path, e)
+                self._file_failed = True
+            return
+        if self._file_failed:
+            log.info("Writing metrics to {0} again", path)
+            self._file_failed = False
+
+    def close(self):
+        self._stop_server()
+        self._port = 0
+        self._path = ""
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+# Values are bucketed by their highest bits, 16 buckets per power of two, so recording stays O(1)
+# and percentiles are accurate to within about 6%.
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+
+def _bucket(value: int) -> int:
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + ((value >> shift) & (SUB_BUCKETS - 1))
+
+
+def _bucket_value(bucket: int) -> int:
+    if bucket < SUB_BUCKETS:
+        return bucket
+    shift = bucket // SUB_BUCKETS - 1
+    return (SUB_BUCKETS + bucket % SUB_BUCKETS) << shift
+
+
+class LatencyHistogram:
+    counts: dict[int, int]
+    count: int
+    total: int
+    max: int
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value_us: int):
+        bucket = _bucket(value_us)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value_us
+        if value_us > self.max:
+            self.max = value_us
+
+    def percentile(self, percentile: float) -> int:
+        if self.count == 0:
+            return 0
+        threshold = self.count * percentile / 100
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= threshold:
+                return min(_bucket_value(bucket), self.max)
+        return self.max
+
+    def buckets(self) -> list[tuple[int, int]]:
+        return [(_bucket_value(bucket), self.counts[bucket]) for bucket in sorted(self.counts)]
+
+    def summary(self) -> str:
+        if self.count == 0:
+            return "no samples"
+        return "n={0} p50={1}us p95={2}us p99={3}us max={4}us".format(
+            self.count, self.percentile(50), self.percentile(95), self.percentile(99), self.max)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+
+from metrics.histogram import LatencyHistogram
+
+# received: the device was read, dispatched: handler started, issued: the command queue started the OBS calls the
+# handler queued, returned: they returned, written: LED output report sent
+STAGES = {
+    "dispatch": "received -> dispatched",
+    "queue": "dispatched -> OBS calls issued",
+    "obs": "OBS calls issued -> returned",
+    "leds": "OBS calls returned -> LEDs written",
+    "total": "received -> LEDs written, or OBS calls returned if no LED changed",
+}
+# OBS reports what the calls changed asynchronously, LED writes any later than this aren't attributed to them
+REACTION_NS = 100_000_000
+
+
+# The timestamps of one key press, the command queue fills in issued and returned once it executes its OBS calls
+class KeyPress:
+    received_ns: int
+    dispatched_ns: int
+    handled_ns: int
+    commands: int
+    issued_ns: int
+    returned_ns: int
+    written_ns: int
+    # its commands were dropped before they ran
+    discarded: bool
+
+    def __init__(self, received_ns: int, dispatched_ns: int):
+        self.received_ns = received_ns
+        self.dispatched_ns = dispatched_ns
+        self.handled_ns = 0
+        self.commands = 0
+        self.issued_ns = 0
+        self.returned_ns = 0
+        self.written_ns = 0
+        self.discarded = False
+
+
+class LatencyTracker:
+    histograms: dict[str, LatencyHistogram]
+    # key presses whose OBS calls haven't been issued yet, a command flush issues all of them at once
+    _queued: deque[KeyPress]
+    _pending: list[KeyPress]
+
+    def __init__(self):
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self._queued = deque()
+        self._pending = []
+
+    def handled(self, press: KeyPress):
+        press.handled_ns = time.perf_counter_ns()
+        if press.commands:
+            self._queued.append(press)
+        else:
+            self._pending.append(press)
+
+    def flushed(self, written: bool):
+        # only presses that submitted before the last command flush are taken off the queue
+        while self._queued and (self._queued[0].issued_ns or self._queued[0].discarded):
+            self._pending.append(self._queued.popleft())
+        if not self._pending:
+            return
+        flushed_ns = time.perf_counter_ns()
+        pending = []
+        for press in self._pending:
+            if press.discarded:
+                continue
+            if press.commands and not press.returned_ns:
+                # OBS may react to the calls while they are still running
+                if written and not press.written_ns:
+                    press.written_ns = flushed_ns
+                pending.append(press)
+                continue
+            reacted_ns = press.returned_ns if press.commands else press.handled_ns
+            if written and not press.written_ns and flushed_ns - reacted_ns <= REACTION_NS:
+                press.written_ns = flushed_ns
+            # a handler's own LED changes are written by the first flush, OBS' reactions can take longer
+            if press.written_ns or not press.commands or flushed_ns - reacted_ns > REACTION_NS:
+                self._record(press, reacted_ns)
+            else:
+                pending.append(press)
+        self._pending = pending
+
+    def _record(self, press: KeyPress, reacted_ns: int):
+        self.histograms["dispatch"].record((press.dispatched_ns - press.received_ns) // 1000)
+        if press.commands:
+            self.histograms["queue"].record((press.issued_ns - press.dispatched_ns) // 1000)
+            self.histograms["obs"].record((press.returned_ns - press.issued_ns) // 1000)
+        done_ns = reacted_ns
+        if press.written_ns:
+            done_ns = max(press.written_ns, reacted_ns)
+            self.histograms["leds"].record((done_ns - reacted_ns) // 1000)
+        self.histograms["total"].record((done_ns - press.received_ns) // 1000)
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+        self._queued.clear()
+        self._pending.clear()
+
+    def summary(self, detailed: bool = False) -> list[str]:
+        lines = []
+        for stage, description in STAGES.items():
+            histogram = self.histograms[stage]
+            lines.append("{0}: {1}".format(description, histogram.summary()))
+            if detailed:
+                lines.extend("    {0:>8}us {1}".format(value, count) for value, count in histogram.buckets())
+        return lines
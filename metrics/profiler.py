@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Optional, TypeVar, TYPE_CHECKING
+
+import log
+
+if TYPE_CHECKING:
+    import cProfile
+    import tracemalloc
+
+STATS_LIMIT = 60
+ALLOCATIONS_LIMIT = 30
+
+Callback = TypeVar("Callback", bound=Callable)
+
+
+# The OBS callbacks are always wrapped, but only pay for profiling while it is switched on
+class CallbackProfiler:
+    _directory: str
+    _profile: Optional[cProfile.Profile]
+    _depth: int
+    _started: float
+    _allocations: Optional[tracemalloc.Snapshot]
+    _started_tracemalloc: bool
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        self._profile = None
+        self._depth = 0
+        self._started = 0
+        self._allocations = None
+        self._started_tracemalloc = False
+
+    def wrap(self, function: Callback) -> Callback:
+        def profiled(*args):
+            profile = self._profile
+            # OBS emits frontend events from inside our own calls, only the outermost callback toggles the profiler
+            if profile is None or self._depth > 0:
+                return function(*args)
+            self._depth += 1
+            profile.enable()
+            try:
+                return function(*args)
+            finally:
+                profile.disable()
+                self._depth -= 1
+
+        return profiled
+
+    def running(self) -> bool:
+        return self._profile is not None
+
+    def set_enabled(self, enabled: bool):
+        if enabled and self._profile is None:
+            self.start()
+        elif not enabled and self._profile is not None:
+            self.stop()
+
+    def start(self):
+        # pstats and tracemalloc alone would add tens of milliseconds to every script load
+        import cProfile
+        import tracemalloc
+
+        self._started = time.time()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._allocations = tracemalloc.take_snapshot()
+        self._profile = cProfile.Profile()
+        log.info("Profiling plugin callbacks")
+
+    def stop(self) -> Optional[str]:
+        profile = self._profile
+        if profile is None:
+            return None
+        import pstats
+        import tracemalloc
+
+        self._profile = None
+        allocations = tracemalloc.take_snapshot().compare_to(self._allocations, "lineno")
+        self._allocations = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+        base = os.path.join(self._directory, time.strftime("profile-%Y%m%d-%H%M%S", time.localtime(self._started)))
+        try:
+            # the raw profile can be opened with pstats, snakeviz and the like
+            profile.dump_stats(base + ".prof")
+            with open(base + ".txt", "w") as file:
+                file.write("Profiled for {0:.1f}s\n\n".format(time.time() - self._started))
+                stats = pstats.Stats(profile, stream=file)
+                stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(STATS_LIMIT)
+                stats.sort_stats(pstats.SortKey.TIME).print_stats(STATS_LIMIT)
+                file.write("Allocations while profiling, largest growth first\n\n")
+                for stat in allocations[:ALLOCATIONS_LIMIT]:
+                    file.write("{0}\n".format(stat))
+        except OSError as e:
+            log.warning("Could not write profile to {0}: {1}", base, e)
+            return None
+        log.info("Profile written to {0}.txt", base)
+        return base + ".txt"
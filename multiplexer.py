@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import os
+import selectors
+
+from bmd_hid_device.hiddevice import BmdHidDevice
+
+import log
+
+# hidraw reports are at most a few hundred bytes, each read returns a single report
+DRAIN_SIZE = 4096
+
+
+# BmdHidDevice doesn't expose the file descriptor hidapi reads from. hidraw gives every open file its own copy of
+# each report though, so we open the device node a second time and only use it to learn which devices have input.
+class DeviceMultiplexer:
+    _selector: selectors.BaseSelector
+    _watched: dict[BmdHidDevice, int]
+    _unwatched: list[BmdHidDevice]
+    _recent: list[BmdHidDevice]
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._watched = {}
+        self._unwatched = []
+        self._recent = []
+
+    def register(self, device: BmdHidDevice):
+        if device in self._watched or device in self._unwatched:
+            return
+        path = os.fsdecode(device.device_info()["path"])
+        try:
+            if not path.startswith("/dev/hidraw"):
+                raise OSError("not a hidraw device")
+            fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+        except OSError as e:
+            log.warning("Polling {0} on every cycle, could not watch {1}: {2}", device, path, e)
+            self._unwatched.append(device)
+            return
+        self._selector.register(fd, selectors.EVENT_READ, device)
+        self._watched[device] = fd
+        # reports that arrived before our file was opened are only in the file hidapi reads from
+        self._recent.append(device)
+
+    def unregister(self, device: BmdHidDevice):
+        fd = self._watched.pop(device, None)
+        if fd is not None:
+            self._selector.unregister(fd)
+            os.close(fd)
+        if device in self._unwatched:
+            self._unwatched.remove(device)
+        if device in self._recent:
+            self._recent.remove(device)
+
+    def keep(self, device: BmdHidDevice):
+        if device in self._watched and device not in self._recent:
+            self._recent.append(device)
+
+    def ready(self) -> list[BmdHidDevice]:
+        # devices serviced on the last cycle are polled once more, hidapi's copy of a report can trail behind ours
+        devices = self._recent
+        self._recent = []
+        for key, _ in self._selector.select(0):
+            self._drain(key.fd)
+            self._recent.append(key.data)
+            if key.data not in devices:
+                devices.append(key.data)
+        devices.extend(self._unwatched)
+        return devices
+
+    @staticmethod
+    def _drain(fd: int):
+        while True:
+            try:
+                if not os.read(fd, DRAIN_SIZE):
+                    return
+            except OSError:
+                # BlockingIOError once drained, anything else means the device is gone, which its poll reports
+                return
+
+    def close(self):
+        for device in list(self._watched):
+            self.unregister(device)
+        self._unwatched = []
+        self._selector.close()
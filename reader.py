@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import os
+import queue
+import selectors
+import threading
+import time
+from typing import Optional
+
+import hid
+from bmd_hid_device.hiddevice import BmdHidDevice
+
+import log
+from events.input_event import InputEvent, ErrorEvent
+
+# Where the device node can't be watched, the reader waits in short slices between polls
+READ_INTERVAL = 0.002
+DRAIN_SIZE = 4096
+
+
+# BmdHidDevice only exposes a non-blocking poll. On Linux, hidraw hands every open file its own copy of each report,
+# so the reader blocks on a second read-only file of the device node and polls the device once it becomes readable.
+class DeviceReader(threading.Thread):
+    _device: BmdHidDevice
+    _events: queue.SimpleQueue[tuple[int, InputEvent]]
+    _lock: threading.RLock
+    _stopped: threading.Event
+    _selector: Optional[selectors.BaseSelector]
+    _watched_fd: Optional[int]
+    _wake_fds: Optional[tuple[int, int]]
+
+    def __init__(self, device: BmdHidDevice, events: queue.SimpleQueue[tuple[int, InputEvent]],
+                 lock: threading.RLock):
+        super().__init__(name="bmd-reader-{0}".format(device.device_info()["serial_number"]), daemon=True)
+        self._device = device
+        self._events = events
+        self._lock = lock
+        self._stopped = threading.Event()
+        self._selector = None
+        self._watched_fd = None
+        self._wake_fds = None
+        self._watch()
+
+    def _watch(self):
+        path = os.fsdecode(self._device.device_info()["path"])
+        if not path.startswith("/dev/hidraw"):
+            return
+        try:
+            self._watched_fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+        except OSError as e:
+            log.warning("Polling {0} every {1} ms, could not watch {2}: {3}", self._device, READ_INTERVAL * 1000,
+                        path, e)
+            return
+        self._wake_fds = os.pipe()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._watched_fd, selectors.EVENT_READ)
+        self._selector.register(self._wake_fds[0], selectors.EVENT_READ)
+
+    def run(self):
+        try:
+            self._read()
+        except hid.HIDException as e:
+            # errors are handled on the OBS thread, which owns closing and removing the device
+            self._events.put((time.perf_counter_ns(), ErrorEvent(e)))
+
+    def _read(self):
+        # reports that arrived before our file was opened are only in the file hidapi reads from
+        recent = True
+        while not self._stopped.is_set():
+            with self._lock:
+                self._device.poll_available()
+            if self._selector is None:
+                self._stopped.wait(READ_INTERVAL)
+                continue
+            # hidapi's copy of a report can trail behind ours, a device that just had input is polled once more
+            ready = self._selector.select(READ_INTERVAL if recent else None)
+            recent = False
+            for key, _ in ready:
+                if key.fd == self._watched_fd:
+                    self._drain(key.fd)
+                    recent = True
+
+    @staticmethod
+    def _drain(fd: int):
+        while True:
+            try:
+                if not os.read(fd, DRAIN_SIZE):
+                    return
+            except OSError:
+                # BlockingIOError once drained, anything else means the device is gone, which its poll reports
+                return
+
+    def _unwatch(self):
+        if self._selector is None:
+            return
+        self._selector.close()
+        os.close(self._watched_fd)
+        os.close(self._wake_fds[0])
+        os.close(self._wake_fds[1])
+        self._selector = None
+        self._wake_fds = None
+
+    def stop(self):
+        self._stopped.set()
+        if self._wake_fds is not None:
+            try:
+                os.write(self._wake_fds[1], b"\0")
+            except OSError:
+                pass
+        if self is threading.current_thread():
+            return
+        self.join(timeout=1)
+        # the files are only closed once the reader can no longer be waiting on them
+        if not self.is_alive():
+            self._unwatch()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+import obspython as obs
+
+from settings.input import InputSettings
+
+FAST_INTERVAL_MS = 1
+IDLE_INTERVAL_MS = 30
+# how long to keep polling fast after the last input
+IDLE_AFTER_NS = 2_000_000_000
+
+
+class PollScheduler:
+    _poll: Callable[[], bool]
+    _input_settings: InputSettings
+    _tick: Callable[[], None]
+    _interval: int
+    _last_active_ns: int
+    _running: bool
+
+    def __init__(self, poll: Callable[[], bool], input_settings: InputSettings):
+        self._poll = poll
+        self._input_settings = input_settings
+        # OBS identifies timers by their callback, so the same bound method has to be used for add and remove
+        self._tick = self.tick
+        self._interval = FAST_INTERVAL_MS
+        self._last_active_ns = 0
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._interval = FAST_INTERVAL_MS
+        self._last_active_ns = time.monotonic_ns()
+        obs.timer_add(self._tick, self._interval)
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        obs.timer_remove(self._tick)
+
+    def interval(self) -> int:
+        return self._interval
+
+    def tick(self):
+        active = self._poll()
+        now = time.monotonic_ns()
+        if active:
+            self._last_active_ns = now
+        if not self._input_settings.adaptive_polling() or now - self._last_active_ns < IDLE_AFTER_NS:
+            self._reschedule(FAST_INTERVAL_MS)
+        else:
+            self._reschedule(IDLE_INTERVAL_MS)
+
+    def _reschedule(self, interval: int):
+        if not self._running or interval == self._interval:
+            return
+        obs.timer_remove(self._tick)
+        self._interval = interval
+        obs.timer_add(self._tick, interval)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Optional, TYPE_CHECKING
+
+import obspython as obs
+
+import log
+from settings.manager import SettingsManager
+
+if TYPE_CHECKING:
+    from devices import DeviceManager
+    from metrics.exporter import MetricsExporter
+    from metrics.profiler import CallbackProfiler
+
+
+class DiagnosticsSettings(SettingsManager):
+    DEBUG_LOG = "diagnostics_debug_log"
+    DUMP_TRACE = "diagnostics_dump_trace"
+    LATENCY = "diagnostics_latency"
+    DUMP_LATENCY = "diagnostics_dump_latency"
+    RESET_LATENCY = "diagnostics_reset_latency"
+    METRICS_PORT = "diagnostics_metrics_port"
+    METRICS_FILE = "diagnostics_metrics_file"
+    PROFILE = "diagnostics_profile"
+
+    device_manager: Optional[DeviceManager]
+    metrics_exporter: Optional[MetricsExporter]
+    profiler: Optional[CallbackProfiler]
+    _directory: str
+
+    def __init__(self, directory: str):
+        self.device_manager = None
+        self.metrics_exporter = None
+        self.profiler = None
+        self._directory = directory
+
+    def properties(self, properties: obs.Properties):
+        obs.obs_properties_add_bool(properties, self.DEBUG_LOG, "Log: Write debug messages to the script log")
+        obs.obs_properties_add_button(properties, self.DUMP_TRACE, "Dump recent debug trace", self._dump_trace)
+        report = self.device_manager.latency_report() if self.device_manager is not None else []
+        obs.obs_properties_add_text(
+            properties, self.LATENCY, "\n".join(report) if report else "Latency: no devices connected",
+            obs.OBS_TEXT_INFO)
+        obs.obs_properties_add_button(properties, self.DUMP_LATENCY, "Dump latency histograms", self._dump_latency)
+        obs.obs_properties_add_button(properties, self.RESET_LATENCY, "Reset latency histograms", self._reset_latency)
+        obs.obs_properties_add_int(properties, self.METRICS_PORT, "Metrics: HTTP port on localhost (0 = off)",
+                                   0, 65535, 1)
+        obs.obs_properties_add_path(properties, self.METRICS_FILE, "Metrics: File", obs.OBS_PATH_FILE_SAVE,
+                                    "Prometheus text (*.prom);;All files (*)", None)
+        obs.obs_properties_add_bool(properties, self.PROFILE,
+                                    "Profiling: Record plugin callbacks, written to the script directory when off")
+
+    def defaults(self, settings: obs.Data):
+        obs.obs_data_set_default_bool(settings, self.DEBUG_LOG, False)
+        obs.obs_data_set_default_int(settings, self.METRICS_PORT, 0)
+        obs.obs_data_set_default_string(settings, self.METRICS_FILE, "")
+        obs.obs_data_set_default_bool(settings, self.PROFILE, False)
+
+    def update(self, settings: obs.Data):
+        log.set_debug(obs.obs_data_get_bool(settings, self.DEBUG_LOG))
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.configure(obs.obs_data_get_int(settings, self.METRICS_PORT),
+                                            obs.obs_data_get_string(settings, self.METRICS_FILE))
+        if self.profiler is not None:
+            self.profiler.set_enabled(obs.obs_data_get_bool(settings, self.PROFILE))
+
+    def _dump_trace(self, properties: obs.Properties, prop: obs.Property) -> bool:
+        log.flush_trace()
+        return False
+
+    def _dump_latency(self, properties: obs.Properties, prop: obs.Property) -> bool:
+        if self.device_manager is None:
+            return False
+        path = os.path.join(self._directory, time.strftime("latency-%Y%m%d-%H%M%S.txt"))
+        with open(path, "w") as file:
+            file.write("\n".join(self.device_manager.latency_report(detailed=True)))
+            file.write("\n")
+        log.info("latency histograms written to {0}", path)
+        return False
+
+    def _reset_latency(self, properties: obs.Properties, prop: obs.Property) -> bool:
+        if self.device_manager is not None:
+            self.device_manager.reset_latency()
+        return True
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+from typing import Optional, TYPE_CHECKING
+
+import obspython as obs
+
+import log
+from settings.manager import SettingsManager
+from ui_state.jog import JogCurve
+
+# the keymap needs bmd_hid_device, which the plugin only imports in script_load
+if TYPE_CHECKING:
+    from ui_state.keymap import Keymap
+
+
+class InputSettings(SettingsManager):
+    THREADED = "input_threaded"
+    ADAPTIVE_POLLING = "input_adaptive_polling"
+    MULTIPLEXED = "input_multiplexed"
+    JOG_PIVOT = "input_jog_pivot"
+    JOG_CURVE = "input_jog_curve"
+    KEYMAP = "input_keymap"
+    KEYMAP_FILE = "input_keymap_file"
+
+    _threaded: bool
+    _adaptive_polling: bool
+    _multiplexed: bool
+    _jog_curve: JogCurve
+    _keymap_file: Optional[tuple[str, int]]
+    _keymap_text: Optional[str]
+    _keymap: Optional[Keymap]
+
+    def __init__(self):
+        self._threaded = False
+        self._adaptive_polling = False
+        self._multiplexed = False
+        self._jog_curve = JogCurve(200, 2.2)
+        self._keymap_file = None
+        self._keymap_text = None
+        self._keymap = None
+
+    def properties(self, properties: obs.Properties):
+        obs.obs_properties_add_bool(properties, self.THREADED, "Input: Background reader threads")
+        obs.obs_properties_add_bool(properties, self.ADAPTIVE_POLLING, "Input: Slow down polling when idle")
+        obs.obs_properties_add_bool(properties, self.MULTIPLEXED, "Input: Only poll devices with pending input (Linux)")
+        obs.obs_properties_add_float(properties, self.JOG_PIVOT, "Jog: Pivot", 1, 10000, 1)
+        obs.obs_properties_add_float(properties, self.JOG_CURVE, "Jog: Curve", 0.1, 10, 0.1)
+        obs.obs_properties_add_text(properties, self.KEYMAP, "Keymap", obs.OBS_TEXT_MULTILINE)
+        obs.obs_properties_add_path(properties, self.KEYMAP_FILE, "Keymap: File (replaces the keymap above)",
+                                    obs.OBS_PATH_FILE, "Keymap (*.txt *.keymap);;All files (*)", None)
+
+    def defaults(self, settings: obs.Data):
+        from ui_state.keymap import DEFAULT_KEYMAP
+
+        obs.obs_data_set_default_bool(settings, self.THREADED, False)
+        obs.obs_data_set_default_bool(settings, self.ADAPTIVE_POLLING, False)
+        obs.obs_data_set_default_bool(settings, self.MULTIPLEXED, False)
+        obs.obs_data_set_default_double(settings, self.JOG_PIVOT, 200)
+        obs.obs_data_set_default_double(settings, self.JOG_CURVE, 2.2)
+        obs.obs_data_set_default_string(settings, self.KEYMAP, DEFAULT_KEYMAP)
+        obs.obs_data_set_default_string(settings, self.KEYMAP_FILE, "")
+
+    def update(self, settings: obs.Data):
+        self._threaded = obs.obs_data_get_bool(settings, self.THREADED)
+        self._adaptive_polling = obs.obs_data_get_bool(settings, self.ADAPTIVE_POLLING)
+        self._multiplexed = obs.obs_data_get_bool(settings, self.MULTIPLEXED)
+        pivot = obs.obs_data_get_double(settings, self.JOG_PIVOT)
+        curve = obs.obs_data_get_double(settings, self.JOG_CURVE)
+        # the lookup table is only rebuilt if the curve actually changed
+        if pivot > 0 and curve > 0 and (pivot, curve) != (self._jog_curve.pivot, self._jog_curve.curve):
+            self._jog_curve = JogCurve(pivot, curve)
+        self._update_keymap(settings)
+
+    def _update_keymap(self, settings: obs.Data):
+        from ui_state.keymap import Keymap, DEFAULT_KEYMAP
+
+        path = obs.obs_data_get_string(settings, self.KEYMAP_FILE)
+        text = None
+        if path:
+            try:
+                # the file is only read again once it has been modified
+                keymap_file = (path, os.stat(path).st_mtime_ns)
+                if keymap_file == self._keymap_file:
+                    return
+                with open(path) as file:
+                    text = file.read()
+                self._keymap_file = keymap_file
+            except OSError as e:
+                log.warning("Could not read keymap {0}, using the keymap from the settings: {1}", path, e)
+        if text is None:
+            self._keymap_file = None
+            # only a missing value means the default, an empty keymap unbinds every key
+            if obs.obs_data_has_user_value(settings, self.KEYMAP) or \
+                    obs.obs_data_has_default_value(settings, self.KEYMAP):
+                text = obs.obs_data_get_string(settings, self.KEYMAP)
+            else:
+                text = DEFAULT_KEYMAP
+        # devices recompile their dispatch tables whenever the keymap instance changes
+        if text == self._keymap_text:
+            return
+        self._keymap_text = text
+        self._keymap = Keymap(text)
+        for error in self._keymap.errors:
+            log.warning("Keymap {0}", error)
+        log.info("Keymap loaded with {0} bindings", len(self._keymap.bindings))
+
+    def threaded(self) -> bool:
+        return self._threaded
+
+    def adaptive_polling(self) -> bool:
+        return self._adaptive_polling
+
+    def multiplexed(self) -> bool:
+        # the background readers already wait for input on their own
+        return self._multiplexed and not self._threaded
+
+    def jog_curve(self) -> JogCurve:
+        return self._jog_curve
+
+    def keymap(self) -> Keymap:
+        if self._keymap is None:
+            from ui_state.keymap import Keymap, DEFAULT_KEYMAP
+
+            self._keymap_text = DEFAULT_KEYMAP
+            self._keymap = Keymap(DEFAULT_KEYMAP)
+        return self._keymap
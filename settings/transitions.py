@@ -1,10 +1,25 @@
 from __future__ import annotations
 
+import types
+from typing import Optional, NamedTuple, Mapping, TYPE_CHECKING
+
 import obspython as obs
-from bmd_hid_device.cutmode import CutMode
 
 from settings.manager import SettingsManager
 
+# the plugin imports this module up front, everything else waits until script_load or later
+if TYPE_CHECKING:
+    from bmd_hid_device.cutmode import CutMode
+    from frontend.transitions import TransitionCatalogue
+
+
+# Replaced as a whole, and only when a value changed, so users can tell changes apart by version
+class TransitionSnapshot(NamedTuple):
+    version: int
+    skip_transition: int
+    transitions: Mapping[CutMode, int]
+    modes_by_index: Mapping[int, frozenset[CutMode]]
+
 
 class TransitionSettings(SettingsManager):
     MODE_NONE = "transition_disabled"
@@ -12,15 +27,25 @@ class TransitionSettings(SettingsManager):
     MODE_DIS = "transition_dis"
     MODE_SMTH_CUT = "transition_smth_cut"
 
-    _transitions: dict[CutMode, int]
-    _skip_transition: int
+    _snapshot: TransitionSnapshot
+    _catalogue: Optional[TransitionCatalogue]
 
     def __init__(self):
-        self._transitions = {}
-        self._skip_transition = -1
+        self._snapshot = TransitionSnapshot(0, -1, types.MappingProxyType({}), types.MappingProxyType({}))
+        self._catalogue = None
+
+    # registered for frontend.transitions.CATALOGUE_EVENTS only
+    def on_frontend_event(self, event: obs.FrontendEvent):
+        self._catalogue = None
+
+    def catalogue(self) -> TransitionCatalogue:
+        if self._catalogue is None:
+            from frontend.transitions import TransitionCatalogue
+
+            self._catalogue = TransitionCatalogue.load()
+        return self._catalogue
 
     def properties(self, properties: obs.Properties):
-        transitions = obs.obs_frontend_get_transitions()
         transition_none = obs.obs_properties_add_list(
             properties, self.MODE_NONE, "Transition: None",
             obs.OBS_COMBO_TYPE_LIST, obs.OBS_COMBO_FORMAT_INT)
@@ -33,45 +58,53 @@ class TransitionSettings(SettingsManager):
         transition_smth_cut = obs.obs_properties_add_list(
             properties, self.MODE_SMTH_CUT, "Transition: Smth Cut",
             obs.OBS_COMBO_TYPE_LIST, obs.OBS_COMBO_FORMAT_INT)
-        obs.obs_property_list_add_int(transition_none, "None", -1)
-        obs.obs_property_list_add_int(transition_cut, "None", -1)
-        obs.obs_property_list_add_int(transition_dis, "None", -1)
-        obs.obs_property_list_add_int(transition_smth_cut, "None", -1)
-        for index, transition in enumerate(transitions):
-            transition_name = obs.obs_source_get_name(transition)
-            obs.obs_property_list_add_int(transition_none, transition_name, index)
-            obs.obs_property_list_add_int(transition_cut, transition_name, index)
-            obs.obs_property_list_add_int(transition_dis, transition_name, index)
-            obs.obs_property_list_add_int(transition_smth_cut, transition_name, index)
-        obs.source_list_release(transitions)
+        names = self.catalogue().names
+        for transition_list in (transition_none, transition_cut, transition_dis, transition_smth_cut):
+            obs.obs_property_list_add_int(transition_list, "None", -1)
+            for index, transition_name in enumerate(names):
+                obs.obs_property_list_add_int(transition_list, transition_name, index)
 
     def defaults(self, settings: obs.Data):
-        transitions = obs.obs_frontend_get_transitions()
-        transition_ids = [obs.obs_source_get_id(transition) for transition in transitions]
-        obs.source_list_release(transitions)
+        catalogue = self.catalogue()
         obs.obs_data_set_autoselect_int(settings, self.MODE_NONE, -1)
         obs.obs_data_set_autoselect_int(settings, self.MODE_CUT, -1)
         obs.obs_data_set_autoselect_int(settings, self.MODE_DIS, -1)
         obs.obs_data_set_autoselect_int(settings, self.MODE_SMTH_CUT, -1)
-        cut_idx = transition_ids.index("cut_transition")
+        # both are built into OBS, but the collection may not be loaded yet
+        cut_idx = catalogue.index_of_id("cut_transition")
+        cut_idx = cut_idx if cut_idx is not None else -1
         obs.obs_data_set_default_int(settings, self.MODE_NONE, cut_idx)
         obs.obs_data_set_default_int(settings, self.MODE_CUT, cut_idx)
-        fade_idx = transition_ids.index("fade_transition")
+        fade_idx = catalogue.index_of_id("fade_transition")
+        fade_idx = fade_idx if fade_idx is not None else -1
         obs.obs_data_set_default_int(settings, self.MODE_DIS, fade_idx)
         obs.obs_data_set_default_int(settings, self.MODE_SMTH_CUT, -1)
 
     def update(self, settings: obs.Data):
-        self._skip_transition = obs.obs_data_get_int(settings, self.MODE_NONE)
-        self._transitions = {
+        from bmd_hid_device.cutmode import CutMode
+
+        skip_transition = obs.obs_data_get_int(settings, self.MODE_NONE)
+        transitions = {
             CutMode.CUT: obs.obs_data_get_int(settings, self.MODE_CUT),
             CutMode.DIS: obs.obs_data_get_int(settings, self.MODE_DIS),
             CutMode.SMTH_CUT: obs.obs_data_get_int(settings, self.MODE_SMTH_CUT),
         }
+        if skip_transition == self._snapshot.skip_transition and transitions == self._snapshot.transitions:
+            return
+        modes_by_index: dict[int, set[CutMode]] = {}
+        for mode, index in transitions.items():
+            modes_by_index.setdefault(index, set()).add(mode)
+        self._snapshot = TransitionSnapshot(
+            self._snapshot.version + 1, skip_transition, types.MappingProxyType(transitions),
+            types.MappingProxyType({index: frozenset(modes) for index, modes in modes_by_index.items()}))
+
+    def snapshot(self) -> TransitionSnapshot:
+        return self._snapshot
 
-    def get_modes(self, index: int) -> (set[CutMode], bool):
-        modes = set(mode for mode in CutMode if self._transitions[mode] == index)
-        skip_transitions = self._skip_transition == index
+    def get_modes(self, index: Optional[int]) -> (set[CutMode], bool):
+        modes = set(self._snapshot.modes_by_index.get(index, ()))
+        skip_transitions = index is not None and self._snapshot.skip_transition == index
         return modes, skip_transitions
 
     def get_transition(self, modes: list[CutMode]) -> (list[int], int):
-        return [self._transitions[mode] for mode in modes], self._skip_transition
+        return [self._snapshot.transitions[mode] for mode in modes], self._snapshot.skip_transition
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import argparse
+import importlib.machinery
+import importlib.util
+import marshal
+import os
+import struct
+import sys
+import zipfile
+
+PROJECT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# not part of the plugin at runtime, __venv__ is replaced by a stub since the bundle carries its dependencies
+EXCLUDED_DIRECTORIES = {"__venv__", "__pycache__", "benchmarks", "tools", "dist"}
+DEPENDENCIES = ["bmd_hid_device", "hid"]
+BUNDLE_NAME = "bmd_obs_bundle.zip"
+VENV_STUB = b"activated = True\n"
+
+LOADER = '''# Generated by tools/bundle.py, loads the precompiled plugin from {bundle}
+import os
+import sys
+import zipimport
+
+_bundle = os.path.join(os.path.dirname(os.path.abspath(__file__)), "{bundle}")
+if sys.version_info[:2] != ({major}, {minor}):
+    raise RuntimeError("{bundle} was built for Python {major}.{minor}, but OBS is running Python {{0}}.{{1}}".format(
+        *sys.version_info[:2]))
+if _bundle not in sys.path:
+    sys.path.insert(0, _bundle)
+exec(zipimport.zipimporter(_bundle).get_code("bmd_obs_plugin"), globals())
+'''
+
+
+def _pyc(source: bytes, filename: str, optimize: int) -> bytes:
+    code = compile(source, filename, "exec", dont_inherit=True, optimize=optimize)
+    # timestamp based header without a timestamp, there is no source in the bundle to compare against
+    return importlib.util.MAGIC_NUMBER + struct.pack("<III", 0, 0, len(source) & 0xFFFFFFFF) + marshal.dumps(code)
+
+
+def _walk(directory: str, excluded: set[str]) -> list[str]:
+    files = []
+    for root, directories, names in os.walk(directory):
+        directories[:] = sorted(name for name in directories if name not in excluded and not name.startswith("."))
+        files.extend(os.path.join(root, name) for name in sorted(names))
+    return files
+
+
+def plugin_sources() -> dict[str, str]:
+    return {os.path.relpath(path, PROJECT_DIRECTORY): path
+            for path in _walk(PROJECT_DIRECTORY, EXCLUDED_DIRECTORIES) if path.endswith(".py")}
+
+
+def dependency_sources(name: str) -> dict[str, str]:
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.origin is None:
+        raise RuntimeError("dependency {0} is not installed, run this inside the pipenv environment".format(name))
+    if not spec.submodule_search_locations:
+        if not spec.origin.endswith(".py"):
+            raise RuntimeError("dependency {0} is not pure Python: {1}".format(name, spec.origin))
+        return {os.path.basename(spec.origin): spec.origin}
+    sources = {}
+    for location in spec.submodule_search_locations:
+        base = os.path.dirname(location)
+        for path in _walk(location, {"__pycache__"}):
+            if path.endswith(tuple(importlib.machinery.EXTENSION_SUFFIXES)):
+                raise RuntimeError("dependency {0} is not pure Python: {1}".format(name, path))
+            if path.endswith(".py"):
+                sources[os.path.relpath(path, base)] = path
+    return sources
+
+
+def build(output: str, dependencies: list[str], optimize: int) -> tuple[str, str]:
+    os.makedirs(output, exist_ok=True)
+    bundle_path = os.path.join(output, BUNDLE_NAME)
+    sources = plugin_sources()
+    for dependency in dependencies:
+        sources.update(dependency_sources(dependency))
+
+    with zipfile.ZipFile(bundle_path, "w", zipfile.ZIP_STORED) as bundle:
+        entries = {"__venv__/__init__.py": VENV_STUB}
+        for name, path in sources.items():
+            with open(path, "rb") as file:
+                entries[name.replace(os.sep, "/")] = file.read()
+        for name, source in sorted(entries.items()):
+            bundle.writestr(name[:-3] + ".pyc", _pyc(source, BUNDLE_NAME + "/" + name, optimize))
+
+    loader_path = os.path.join(output, "bmd_obs_plugin.py")
+    with open(loader_path, "w") as file:
+        file.write(LOADER.format(bundle=BUNDLE_NAME, major=sys.version_info[0], minor=sys.version_info[1]))
+    return bundle_path, loader_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a precompiled bundle of the plugin and its dependencies")
+    parser.add_argument("-o", "--output", default=os.path.join(PROJECT_DIRECTORY, "dist"))
+    parser.add_argument("-O", "--optimize", type=int, default=0, choices=[0, 1, 2])
+    parser.add_argument("--dependency", action="append", dest="dependencies",
+                        help="pure Python package to include, defaults to {0}".format(", ".join(DEPENDENCIES)))
+    args = parser.parse_args()
+    bundle_path, loader_path = build(args.output, args.dependencies or DEPENDENCIES, args.optimize)
+    print("wrote {0} and {1}".format(bundle_path, loader_path))
+    print("add {0} to OBS instead of the bmd_obs_plugin.py in the repository".format(loader_path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import math
+
+# reports from even the fastest spins stay well below this, anything beyond is computed directly
+JOG_TABLE_SIZE = 4096
+
+
+class JogCurve:
+    pivot: float
+    curve: float
+    _table: list[float]
+
+    def __init__(self, pivot: float, curve: float):
+        self.pivot = pivot
+        self.curve = curve
+        self._table = [self._compute(value) for value in range(JOG_TABLE_SIZE)]
+
+    def _compute(self, value: int) -> float:
+        return self.pivot * math.pow(value / 360 / self.pivot, self.curve)
+
+    def map(self, value: int) -> float:
+        magnitude = -value if value < 0 else value
+        if magnitude < JOG_TABLE_SIZE:
+            mapped_value = self._table[magnitude]
+        else:
+            mapped_value = self._compute(magnitude)
+        return -mapped_value if value < 0 else mapped_value
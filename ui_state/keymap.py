@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import enum
+import functools
+from typing import Any, Callable, NamedTuple, Optional, TYPE_CHECKING
+
+from bmd_hid_device.cutmode import CutMode
+from bmd_hid_device.jogmode import JogMode
+from bmd_hid_device.protocol.types import BmdHidKey
+
+from frontend.scenes import BANK_SIZE
+
+if TYPE_CHECKING:
+    from bmd_device import ObsBmdDevice
+
+DEFAULT_KEYMAP = """\
+# KEY = action [argument], one binding per line
+SHTL = jog_mode SHTL
+JOG = jog_mode JOG
+SCRL = jog_mode SCRL
+CUT = cut_mode CUT
+DIS = cut_mode DIS
+SMTH_CUT = cut_mode SMTH_CUT
+TRANS = skip_transitions
+TRANS_DUR = transition_duration
+CAM1 = bank_scene 1
+CAM2 = bank_scene 2
+CAM3 = bank_scene 3
+CAM4 = bank_scene 4
+CAM5 = bank_scene 5
+CAM6 = bank_scene 6
+CAM7 = bank_scene 7
+CAM8 = bank_scene 8
+CAM9 = bank_scene 9
+SOURCE = bank_next
+LIVE_OWR = live_overwrite
+STOP_PLAY = transition
+"""
+
+
+class Phase(enum.Enum):
+    DOWN = "down"
+    UP = "up"
+    HOLD = "hold"
+
+
+class Action(NamedTuple):
+    parse: Callable[[Optional[str]], Any]
+    bind: Callable[[ObsBmdDevice, Any], dict[Phase, Callable]]
+
+
+class Binding(NamedTuple):
+    key: BmdHidKey
+    action: Action
+    argument: Any
+
+
+class KeyDispatch(NamedTuple):
+    down: dict[BmdHidKey, Callable[[], None]]
+    up: dict[BmdHidKey, Callable[[], None]]
+    # called with the jog value while the key is held
+    hold: dict[BmdHidKey, Callable[[int], None]]
+
+
+def _no_argument(argument: Optional[str]) -> None:
+    if argument is not None:
+        raise ValueError("takes no argument")
+
+
+def _enum_argument(enum_type: type[enum.Enum]) -> Callable[[Optional[str]], Any]:
+    def parse(argument: Optional[str]) -> Any:
+        try:
+            return enum_type[(argument or "").upper()]
+        except KeyError:
+            raise ValueError("expected one of {0}".format(", ".join(member.name for member in enum_type)))
+
+    return parse
+
+
+def _number_argument(name: str, maximum: Optional[int] = None) -> Callable[[Optional[str]], int]:
+    def parse(argument: Optional[str]) -> int:
+        try:
+            number = int(argument or "")
+        except ValueError:
+            raise ValueError("expected a {0} number".format(name))
+        if number < 1:
+            raise ValueError("{0} numbers start at 1".format(name))
+        if maximum is not None and number > maximum:
+            raise ValueError("{0} numbers go up to {1}".format(name, maximum))
+        return number - 1
+
+    return parse
+
+
+ACTIONS: dict[str, Action] = {
+    "jog_mode": Action(_enum_argument(JogMode), lambda device, mode: {
+        Phase.DOWN: functools.partial(device.update_jog_mode, mode),
+    }),
+    "cut_mode": Action(_enum_argument(CutMode), lambda device, mode: {
+        Phase.DOWN: functools.partial(device.set_cut_mode, mode),
+    }),
+    "skip_transitions": Action(_no_argument, lambda device, _: {
+        Phase.DOWN: device.toggle_skip_transitions,
+    }),
+    "transition_duration": Action(_no_argument, lambda device, _: {
+        Phase.DOWN: device.begin_transition_duration,
+        Phase.HOLD: device.adjust_transition_duration,
+        Phase.UP: device.end_transition_duration,
+    }),
+    "scene": Action(_number_argument("scene"), lambda device, index: {
+        Phase.DOWN: functools.partial(device.switch_scene, index),
+    }),
+    "bank_scene": Action(_number_argument("scene", BANK_SIZE), lambda device, slot: {
+        Phase.DOWN: functools.partial(device.switch_bank_scene, slot),
+    }),
+    "bank": Action(_number_argument("bank"), lambda device, bank: {
+        Phase.DOWN: functools.partial(device.select_bank, bank),
+        Phase.UP: device.hide_bank,
+    }),
+    "bank_next": Action(_no_argument, lambda device, _: {
+        Phase.DOWN: device.next_bank,
+        Phase.UP: device.hide_bank,
+    }),
+    "bank_previous": Action(_no_argument, lambda device, _: {
+        Phase.DOWN: device.previous_bank,
+        Phase.UP: device.hide_bank,
+    }),
+    "live_overwrite": Action(_no_argument, lambda device, _: {
+        Phase.DOWN: device.toggle_live_overwrite,
+    }),
+    "transition": Action(_no_argument, lambda device, _: {
+        Phase.DOWN: device.trigger_transition,
+    }),
+    "none": Action(_no_argument, lambda device, _: {}),
+}
+
+
+class Keymap:
+    bindings: dict[BmdHidKey, Binding]
+    errors: list[str]
+
+    def __init__(self, text: str):
+        self.bindings = {}
+        self.errors = []
+        for number, line in enumerate(text.splitlines(), 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                binding = self._parse_line(line)
+            except ValueError as e:
+                self.errors.append("line {0}: {1}: {2}".format(number, line, e))
+                continue
+            self.bindings[binding.key] = binding
+
+    @staticmethod
+    def _parse_line(line: str) -> Binding:
+        key_name, separator, definition = line.partition("=")
+        if not separator:
+            raise ValueError("expected KEY = action")
+        try:
+            key = BmdHidKey[key_name.strip().upper()]
+        except KeyError:
+            raise ValueError("unknown key {0}".format(key_name.strip()))
+        action_name, *arguments = definition.split(None, 1) or [""]
+        action = ACTIONS.get(action_name.lower())
+        if action is None:
+            raise ValueError("unknown action {0}".format(action_name))
+        try:
+            argument = action.parse(arguments[0] if arguments else None)
+        except ValueError as e:
+            raise ValueError("{0} {1}".format(action_name, e))
+        return Binding(key, action, argument)
+
+    def compile(self, device: ObsBmdDevice) -> KeyDispatch:
+        dispatch = KeyDispatch({}, {}, {})
+        for key, binding in self.bindings.items():
+            for phase, handler in binding.action.bind(device, binding.argument).items():
+                getattr(dispatch, phase.value)[key] = handler
+        return dispatch
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from bmd_hid_device.hiddevice import BmdHidDevice
+from bmd_hid_device.protocol.types import BmdHidLed
+
+
+class LedFramebuffer:
+    device: BmdHidDevice
+    state: BmdHidLed
+    written: Optional[BmdHidLed]
+
+    def __init__(self, device: BmdHidDevice):
+        self.device = device
+        self.state = BmdHidLed(0)
+        # nothing is known about the hardware state until the first flush
+        self.written = None
+
+    def set(self, group: BmdHidLed, leds: BmdHidLed):
+        self.state = (self.state & ~group) | (leds & group)
+
+    def clear(self):
+        self.state = BmdHidLed(0)
+
+    def dirty(self) -> bool:
+        return self.state != self.written
+
+    def flush(self) -> bool:
+        if not self.dirty():
+            return False
+        state = self.state
+        with self.device.leds as leds:
+            leds.clear()
+            leds.on(state)
+        self.written = state
+        return True